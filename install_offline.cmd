@@ -71,6 +71,9 @@ if not exist cache\qa_responses mkdir cache\qa_responses
 if not exist cache\dkr mkdir cache\dkr
 if not exist domain_rules mkdir domain_rules
 
+REM Pre-compila o codigo (.pyc) para acelerar a primeira execucao
+"%PIP_EXE%" -m compileall -q src run.py >nul 2>&1
+
 echo.
 echo ============================================
 echo  Instalacao concluida com sucesso!
@@ -101,6 +101,10 @@ New-Item -ItemType Directory -Path "domain_rules" -Force | Out-Null
 
 Write-Host "  ✓ Diretórios criados" -ForegroundColor Green
 
+# Pré-compila o código (.pyc) para acelerar a primeira execução
+python -m compileall -q src run.py 2>$null | Out-Null
+Write-Host "  ✓ Código pré-compilado" -ForegroundColor Green
+
 Write-Host ""
 Write-Host "╔═══════════════════════════════════════════════════════════╗" -ForegroundColor Green
 Write-Host "║              INSTALAÇÃO CONCLUÍDA COM SUCESSO!            ║" -ForegroundColor Green
@@ -29,8 +29,10 @@ from pathlib import Path
 # Adiciona src ao path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from inventory_main import main
-
 if __name__ == "__main__":
+    # Import tardio: os modulos pesados (OCR, NLP, RAG) so sao
+    # carregados dentro dos comandos que realmente os utilizam.
+    from inventory_main import main
+
     main()
 
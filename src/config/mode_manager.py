@@ -9,12 +9,17 @@ Este módulo controla como o aplicativo se comporta em relação a:
 
 from __future__ import annotations
 
+import json
 import logging
 import os
 import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from pathlib import Path
+from typing import Dict, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +31,27 @@ class OperationMode(Enum):
     HYBRID = "hybrid"
 
 
-@dataclass
+# Tabela valor -> modo, evitando OperationMode(...) com try/except
+_MODE_LOOKUP: Dict[str, OperationMode] = {m.value: m for m in OperationMode}
+
+
+def _normalize_mode(value: str) -> str:
+    """
+    Normaliza o nome de um modo de operação (minúsculas, sem espaços).
+    
+    Raises:
+        ValueError: Se o valor não corresponder a nenhum OperationMode.
+    """
+    mode = str(value).strip().lower()
+    if mode not in _MODE_LOOKUP:
+        raise ValueError(
+            f"Modo de operação inválido: {value!r}. "
+            f"Use um de: {', '.join(_MODE_LOOKUP)}"
+        )
+    return mode
+
+
+@dataclass(frozen=True, slots=True)
 class OnlineConfig:
     """Configurações para modo online."""
     allow_model_download: bool = True
@@ -36,14 +61,14 @@ class OnlineConfig:
     connection_timeout: int = 10
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class OfflineConfig:
     """Configurações para modo offline."""
     models_path: str = "./models"
     strict: bool = True
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class HybridConfig:
     """Configurações para modo híbrido."""
     prefer: str = "online"  # "online" ou "offline"
@@ -51,7 +76,7 @@ class HybridConfig:
     fallback_timeout: int = 5
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SystemConfig:
     """Configurações do sistema (modo de operação)."""
     mode: str = "offline"
@@ -60,12 +85,14 @@ class SystemConfig:
     hybrid: HybridConfig = None
     
     def __post_init__(self):
+        # Dataclass congelada: os defaults são atribuídos via object.__setattr__
+        object.__setattr__(self, "mode", _normalize_mode(self.mode))
         if self.online is None:
-            self.online = OnlineConfig()
+            object.__setattr__(self, "online", OnlineConfig())
         if self.offline is None:
-            self.offline = OfflineConfig()
+            object.__setattr__(self, "offline", OfflineConfig())
         if self.hybrid is None:
-            self.hybrid = HybridConfig()
+            object.__setattr__(self, "hybrid", HybridConfig())
 
 
 class ModeManager:
@@ -83,6 +110,12 @@ class ModeManager:
     # URLs para teste de conectividade
     HUGGINGFACE_HOST = "huggingface.co"
     HUGGINGFACE_PORT = 443
+    HUGGINGFACE_API_URL = "https://huggingface.co/api/models"
+    HUGGINGFACE_ADDR_TTL = 300  # segundos (cache do DNS)
+    
+    # Cache do teste de conectividade entre execucoes da CLI
+    CONNECTIVITY_CACHE_FILE = Path("./cache/connectivity.json")
+    CONNECTIVITY_CACHE_TTL = 60  # segundos
     
     def __init__(
         self,
@@ -101,146 +134,112 @@ class ModeManager:
             allow_download_override: Override para permitir/bloquear downloads
             use_cloud_generation_override: Override para usar geração cloud
             use_cloud_embeddings_override: Override para usar embeddings cloud
+        
+        Raises:
+            ValueError: Se cli_override não for um modo de operação válido.
         """
         self._config = config or SystemConfig()
-        self._cli_override = cli_override
+        self._cli_override = _normalize_mode(cli_override) if cli_override else None
         self._allow_download_override = allow_download_override
         self._use_cloud_generation_override = use_cloud_generation_override
         self._use_cloud_embeddings_override = use_cloud_embeddings_override
         self._connectivity_tested = False
         self._is_connected = False
+        self._probe_future: Optional[Future] = None
+        self._hub_addr: Optional[tuple] = None
+        self._hub_addr_resolved_at = 0.0
+        self._http_pool = None
         
         # Determina o modo efetivo
         self._effective_mode = self._determine_effective_mode()
+        self._resolve_flags()
+        self._build_environments()
         
-        logger.info(f"ModeManager inicializado - Modo: {self._effective_mode.value}")
+        logger.info("ModeManager inicializado - Modo: %s", self._effective_mode.value)
+        
+        # Em modo híbrido o teste de conectividade roda em paralelo,
+        # para não serializar a inicialização no handshake TCP
+        if self.is_hybrid:
+            self.start_connectivity_check()
     
     def _determine_effective_mode(self) -> OperationMode:
-        """Determina o modo efetivo baseado em config e overrides."""
-        if self._cli_override:
-            try:
-                return OperationMode(self._cli_override.lower())
-            except ValueError:
-                logger.warning(
-                    f"Modo CLI inválido: {self._cli_override}. "
-                    f"Usando configuração padrão."
-                )
+        """
+        Determina o modo efetivo baseado em config e overrides.
         
-        try:
-            return OperationMode(self._config.mode.lower())
-        except ValueError:
-            logger.warning(
-                f"Modo inválido no config: {self._config.mode}. "
-                f"Usando OFFLINE como padrão."
-            )
-            return OperationMode.OFFLINE
+        Os valores já chegam validados (SystemConfig.__post_init__ e
+        normalização do override no __init__).
+        """
+        return _MODE_LOOKUP[self._cli_override or self._config.mode]
     
     @property
     def mode(self) -> OperationMode:
         """Retorna o modo de operação efetivo."""
         return self._effective_mode
     
-    @property
-    def is_offline(self) -> bool:
-        """Verifica se está em modo offline."""
-        return self._effective_mode == OperationMode.OFFLINE
-    
-    @property
-    def is_online(self) -> bool:
-        """Verifica se está em modo online."""
-        return self._effective_mode == OperationMode.ONLINE
-    
-    @property
-    def is_hybrid(self) -> bool:
-        """Verifica se está em modo híbrido."""
-        return self._effective_mode == OperationMode.HYBRID
-    
-    @property
-    def allow_downloads(self) -> bool:
-        """Verifica se downloads são permitidos."""
-        # CLI override tem prioridade
-        if self._allow_download_override is not None:
-            return self._allow_download_override
+    def _resolve_flags(self) -> None:
+        """
+        Calcula os atributos derivados do modo efetivo.
         
-        # Em modo offline, nunca permite downloads
-        if self.is_offline:
-            return False
+        Modo, overrides e configuração não mudam após a inicialização,
+        então os valores são calculados uma única vez e expostos como
+        atributos simples (is_offline, allow_downloads, etc.), evitando
+        reavaliar a lógica a cada consulta.
+        """
+        mode = self._effective_mode
+        online = self._config.online
         
-        # Em modo online ou hybrid, verifica configuração
-        return self._config.online.allow_model_download
-    
-    @property
-    def allow_cloud_apis(self) -> bool:
-        """Verifica se APIs cloud são permitidas."""
-        if self.is_offline:
-            return False
+        self.is_offline = mode == OperationMode.OFFLINE
+        self.is_online = mode == OperationMode.ONLINE
+        self.is_hybrid = mode == OperationMode.HYBRID
         
-        return (
-            self._config.online.use_cloud_embeddings or
-            self._config.online.use_cloud_generation
+        # Downloads: CLI override tem prioridade; offline nunca permite
+        if self._allow_download_override is not None:
+            self.allow_downloads = self._allow_download_override
+        elif self.is_offline:
+            self.allow_downloads = False
+        else:
+            self.allow_downloads = online.allow_model_download
+        
+        self.allow_cloud_apis = not self.is_offline and (
+            online.use_cloud_embeddings or online.use_cloud_generation
         )
-    
-    @property
-    def use_cloud_generation(self) -> bool:
-        """
-        Verifica se deve usar geração cloud (LLM).
         
-        Condições:
-        - Não pode estar em modo offline
-        - CLI override tem prioridade
-        - Senão, usa configuração do config.yaml
-        """
-        # CLI override tem prioridade
-        if self._use_cloud_generation_override is not None:
-            # Mesmo com override, não permite em modo offline
-            if self.is_offline and self._use_cloud_generation_override:
-                logger.warning("Geração cloud solicitada mas modo é OFFLINE. Ignorando.")
-                return False
-            return self._use_cloud_generation_override
-        
-        # Em modo offline, nunca usa cloud
-        if self.is_offline:
-            return False
+        # Geração/embeddings cloud: CLI override tem prioridade, mas
+        # mesmo com override nunca são usados em modo offline
+        self.use_cloud_generation = self._resolve_cloud_flag(
+            self._use_cloud_generation_override,
+            online.use_cloud_generation,
+            "Geração cloud solicitada mas modo é OFFLINE. Ignorando."
+        )
+        self.use_cloud_embeddings = self._resolve_cloud_flag(
+            self._use_cloud_embeddings_override,
+            online.use_cloud_embeddings,
+            "Embeddings cloud solicitados mas modo é OFFLINE. Ignorando."
+        )
         
-        # Usa configuração
-        return self._config.online.use_cloud_generation
+        self.models_path = self._config.offline.models_path
+        self.connection_timeout = (
+            self._config.hybrid.fallback_timeout if self.is_hybrid
+            else online.connection_timeout
+        )
     
-    @property
-    def use_cloud_embeddings(self) -> bool:
-        """
-        Verifica se deve usar embeddings cloud.
-        
-        Condições:
-        - Não pode estar em modo offline
-        - CLI override tem prioridade
-        - Senão, usa configuração do config.yaml
-        """
-        # CLI override tem prioridade
-        if self._use_cloud_embeddings_override is not None:
-            # Mesmo com override, não permite em modo offline
-            if self.is_offline and self._use_cloud_embeddings_override:
-                logger.warning("Embeddings cloud solicitados mas modo é OFFLINE. Ignorando.")
+    def _resolve_cloud_flag(
+        self,
+        override: Optional[bool],
+        configured: bool,
+        offline_warning: str
+    ) -> bool:
+        """Resolve uma flag cloud considerando override da CLI e modo offline."""
+        if override is not None:
+            if self.is_offline and override:
+                logger.warning(offline_warning)
                 return False
-            return self._use_cloud_embeddings_override
+            return override
         
-        # Em modo offline, nunca usa cloud
         if self.is_offline:
             return False
         
-        # Usa configuração
-        return self._config.online.use_cloud_embeddings
-    
-    @property
-    def models_path(self) -> str:
-        """Retorna o caminho dos modelos locais."""
-        return self._config.offline.models_path
-    
-    @property
-    def connection_timeout(self) -> int:
-        """Retorna o timeout de conexão."""
-        if self.is_hybrid:
-            return self._config.hybrid.fallback_timeout
-        return self._config.online.connection_timeout
+        return configured
     
     def configure_environment(self) -> None:
         """
@@ -262,65 +261,232 @@ class ModeManager:
                 logger.info("Modo HYBRID: Sem conectividade, usando modo offline")
                 self._set_offline_environment()
     
-    def _set_offline_environment(self) -> None:
-        """Configura variáveis de ambiente para modo offline."""
-        os.environ["TRANSFORMERS_OFFLINE"] = "1"
-        os.environ["HF_HUB_OFFLINE"] = "1"
-        os.environ["HF_DATASETS_OFFLINE"] = "1"
+    def _build_environments(self) -> None:
+        """
+        Monta, uma única vez, as variáveis de ambiente de cada modo.
         
-        # Configura cache local
-        models_path = os.path.abspath(self._config.offline.models_path)
-        os.environ["HF_HOME"] = models_path
-        os.environ["HF_HUB_CACHE"] = models_path
-        os.environ["TRANSFORMERS_CACHE"] = models_path
+        O caminho absoluto dos modelos é resolvido aqui para não repetir
+        os.path.abspath a cada reconfiguração (ex.: modo híbrido).
+        """
+        self._abs_models_path = os.path.abspath(self.models_path)
         
-        # Desabilita warning de symlinks
-        os.environ["HF_HUB_DISABLE_SYMLINKS_WARNING"] = "1"
+        # Ainda usa cache local em modo online, mas permite downloads
+        cache_env = {
+            "HF_HOME": self._abs_models_path,
+            "HF_HUB_CACHE": self._abs_models_path,
+            "TRANSFORMERS_CACHE": self._abs_models_path,
+        }
         
+        self._offline_env = {
+            "TRANSFORMERS_OFFLINE": "1",
+            "HF_HUB_OFFLINE": "1",
+            "HF_DATASETS_OFFLINE": "1",
+            **cache_env,
+            # Desabilita warning de symlinks
+            "HF_HUB_DISABLE_SYMLINKS_WARNING": "1",
+        }
+        self._online_env = {
+            "TRANSFORMERS_OFFLINE": "0",
+            "HF_HUB_OFFLINE": "0",
+            "HF_DATASETS_OFFLINE": "0",
+            **cache_env,
+        }
+    
+    @staticmethod
+    def _apply_environment(env: Dict[str, str]) -> None:
+        """Aplica as variáveis, ignorando as que já têm o valor desejado."""
+        updates = {k: v for k, v in env.items() if os.environ.get(k) != v}
+        if updates:
+            os.environ.update(updates)
+    
+    def _set_offline_environment(self) -> None:
+        """Configura variáveis de ambiente para modo offline."""
+        self._apply_environment(self._offline_env)
         logger.debug("Ambiente configurado para modo OFFLINE")
     
     def _set_online_environment(self) -> None:
         """Configura variáveis de ambiente para modo online."""
-        os.environ["TRANSFORMERS_OFFLINE"] = "0"
-        os.environ["HF_HUB_OFFLINE"] = "0"
-        os.environ["HF_DATASETS_OFFLINE"] = "0"
-        
-        # Ainda usa cache local, mas permite downloads
-        models_path = os.path.abspath(self._config.offline.models_path)
-        os.environ["HF_HOME"] = models_path
-        os.environ["HF_HUB_CACHE"] = models_path
-        os.environ["TRANSFORMERS_CACHE"] = models_path
-        
+        self._apply_environment(self._online_env)
         logger.debug("Ambiente configurado para modo ONLINE")
     
     def check_connectivity(self, force: bool = False) -> bool:
         """
         Testa conectividade com HuggingFace Hub.
         
+        O resultado é reaproveitado: dentro do processo (após o primeiro
+        teste) e entre execuções (cache em disco com TTL curto).
+        
         Args:
             force: Força novo teste mesmo se já foi testado
         
         Returns:
             bool: True se há conectividade
         """
-        if self._connectivity_tested and not force:
+        if force:
+            self._probe_future = None
+            return self._run_connectivity_check(use_cache=False)
+        
+        if self._probe_future is not None:
+            return self._probe_future.result()
+        
+        if self._connectivity_tested:
             return self._is_connected
         
+        return self._run_connectivity_check(use_cache=True)
+    
+    def start_connectivity_check(self) -> Future:
+        """
+        Dispara o teste de conectividade em background.
+        
+        Returns:
+            Future: Resultado (bool) do teste; check_connectivity() aguarda
+                    este mesmo resultado em vez de abrir nova conexão.
+        """
+        if self._probe_future is None:
+            executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="connectivity"
+            )
+            self._probe_future = executor.submit(
+                self._run_connectivity_check, True
+            )
+            executor.shutdown(wait=False)
+        return self._probe_future
+    
+    def _run_connectivity_check(self, use_cache: bool) -> bool:
+        """Executa o teste (ou lê do cache em disco) e guarda o resultado."""
+        cached = self._read_connectivity_cache() if use_cache else None
+        
+        if cached is not None:
+            self._is_connected = cached
+            logger.debug("Conectividade (cache): %s", cached)
+        else:
+            self._is_connected = self._probe_connectivity()
+            self._write_connectivity_cache(self._is_connected)
+        
         self._connectivity_tested = True
+        return self._is_connected
+    
+    def _probe_connectivity(self) -> bool:
+        """
+        Testa se a API do HuggingFace Hub responde.
+        
+        Com urllib3 disponível, faz um HEAD HTTPS por um pool reutilizável
+        entre testes (ver _get_http_pool), o que também valida TLS e a
+        resposta da API.
+        Sem urllib3, recorre ao teste de conexão TCP na porta 443.
+        """
+        pool = self._get_http_pool()
+        if pool is None:
+            return self._probe_tcp()
         
         try:
-            socket.setdefaulttimeout(self.connection_timeout)
-            socket.create_connection(
-                (self.HUGGINGFACE_HOST, self.HUGGINGFACE_PORT),
-                timeout=self.connection_timeout
+            response = pool.request(
+                "HEAD",
+                self.HUGGINGFACE_API_URL,
+                retries=False,
+                redirect=False,
+            )
+        except Exception as e:
+            logger.debug("Sem conectividade: %s", e)
+            return False
+        
+        if response.status >= 500:
+            logger.debug("HuggingFace Hub indisponível: HTTP %s", response.status)
+            return False
+        
+        logger.debug("Conectividade OK: %s", self.HUGGINGFACE_HOST)
+        return True
+    
+    def _get_http_pool(self):
+        """
+        PoolManager urllib3 do teste de conectividade (keep-alive com o
+        HuggingFace Hub entre testes repetidos).
+        
+        Criado sob demanda; retorna None se urllib3 não estiver instalado.
+        """
+        if self._http_pool is None:
+            try:
+                import urllib3
+            except ImportError:
+                return None
+            self._http_pool = urllib3.PoolManager(
+                maxsize=1,
+                timeout=urllib3.Timeout(total=self.connection_timeout),
             )
-            self._is_connected = True
-            logger.debug(f"Conectividade OK: {self.HUGGINGFACE_HOST}")
-        except (socket.timeout, socket.error, OSError) as e:
-            self._is_connected = False
-            logger.debug(f"Sem conectividade: {e}")
+        return self._http_pool
+    
+    def _probe_tcp(self) -> bool:
+        """
+        Abre uma conexão TCP com o HuggingFace Hub.
         
-        return self._is_connected
+        O timeout é aplicado apenas a este socket; socket.setdefaulttimeout
+        alteraria o comportamento de todas as conexões do processo.
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(self.connection_timeout)
+        try:
+            result = sock.connect_ex(self._resolve_hub_address())
+        except (socket.timeout, OSError) as e:
+            logger.debug("Sem conectividade: %s", e)
+            self._hub_addr = None
+            return False
+        finally:
+            sock.close()
+        
+        if result != 0:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Sem conectividade: %s", os.strerror(result))
+            # Endereço pode estar desatualizado; resolve de novo no próximo teste
+            self._hub_addr = None
+            return False
+        
+        logger.debug("Conectividade OK: %s", self.HUGGINGFACE_HOST)
+        return True
+    
+    def _resolve_hub_address(self) -> tuple:
+        """
+        Resolve (via DNS) o endereço do HuggingFace Hub.
+        
+        O resultado é reaproveitado por HUGGINGFACE_ADDR_TTL segundos, para
+        que novos testes (check_connectivity(force=True)) não repitam a
+        consulta DNS.
+        """
+        now = time.monotonic()
+        if self._hub_addr is None or now - self._hub_addr_resolved_at > self.HUGGINGFACE_ADDR_TTL:
+            self._hub_addr = socket.getaddrinfo(
+                self.HUGGINGFACE_HOST,
+                self.HUGGINGFACE_PORT,
+                socket.AF_INET,
+                socket.SOCK_STREAM
+            )[0][4]
+            self._hub_addr_resolved_at = now
+        return self._hub_addr
+    
+    def _read_connectivity_cache(self) -> Optional[bool]:
+        """Lê resultado recente do cache em disco (None se ausente/expirado)."""
+        try:
+            with open(self.CONNECTIVITY_CACHE_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("host") != self.HUGGINGFACE_HOST:
+                return None
+            if time.time() - data["checked_at"] > self.CONNECTIVITY_CACHE_TTL:
+                return None
+            return bool(data["connected"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def _write_connectivity_cache(self, connected: bool) -> None:
+        """Persiste o resultado do teste para as próximas execuções."""
+        try:
+            self.CONNECTIVITY_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.CONNECTIVITY_CACHE_FILE, "w", encoding="utf-8") as f:
+                json.dump({
+                    "host": self.HUGGINGFACE_HOST,
+                    "connected": connected,
+                    "checked_at": time.time(),
+                }, f)
+        except OSError as e:
+            logger.debug("Erro ao salvar cache de conectividade: %s", e)
     
     def should_use_local_model(self) -> bool:
         """
@@ -386,13 +552,17 @@ class ModeManager:
 
 # Singleton global
 _mode_manager: Optional[ModeManager] = None
+_mode_manager_lock = threading.Lock()
 
 
 def get_mode_manager() -> ModeManager:
     """Obtém o gerenciador de modo global."""
     global _mode_manager
+    # Double-checked locking: o lock só é disputado na primeira criação
     if _mode_manager is None:
-        _mode_manager = ModeManager()
+        with _mode_manager_lock:
+            if _mode_manager is None:
+                _mode_manager = ModeManager()
     return _mode_manager
 
 
@@ -416,19 +586,22 @@ def init_mode_manager(
         use_cloud_embeddings_override: Override para usar embeddings cloud (--use-cloud-embeddings)
     """
     global _mode_manager
-    _mode_manager = ModeManager(
-        config=config,
-        cli_override=cli_override,
-        allow_download_override=allow_download_override,
-        use_cloud_generation_override=use_cloud_generation_override,
-        use_cloud_embeddings_override=use_cloud_embeddings_override
-    )
-    _mode_manager.configure_environment()
-    return _mode_manager
+    with _mode_manager_lock:
+        manager = ModeManager(
+            config=config,
+            cli_override=cli_override,
+            allow_download_override=allow_download_override,
+            use_cloud_generation_override=use_cloud_generation_override,
+            use_cloud_embeddings_override=use_cloud_embeddings_override
+        )
+        manager.configure_environment()
+        _mode_manager = manager
+    return manager
 
 
 def reset_mode_manager() -> None:
     """Reseta o gerenciador de modo (útil para testes)."""
     global _mode_manager
-    _mode_manager = None
+    with _mode_manager_lock:
+        _mode_manager = None
 
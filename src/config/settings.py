@@ -2,23 +2,52 @@
 
 from __future__ import annotations
 
+import copy
 import os
-from dataclasses import dataclass, field
+import sys
+import threading
+from dataclasses import dataclass, field, fields, is_dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import (
+    IO, Any, Dict, Iterator, List, Optional, Tuple, get_origin, get_type_hints,
+)
 
-import yaml
-from dotenv import load_dotenv
+from .mode_manager import SystemConfig
 
-from .mode_manager import (
-    SystemConfig,
-    OnlineConfig,
-    OfflineConfig,
-    HybridConfig,
-)
+# API keys já lidas do ambiente (limpo por reset_settings)
+_api_key_cache: Dict[str, Optional[str]] = {}
+
+
+def _get_api_key(env_name: str) -> Optional[str]:
+    """Lê a variável de ambiente da API key uma única vez por processo."""
+    if env_name not in _api_key_cache:
+        _api_key_cache[env_name] = os.getenv(env_name)
+    return _api_key_cache[env_name]
 
 
-@dataclass
+def load_yaml(path: Path) -> Dict[str, Any]:
+    """
+    Lê um arquivo YAML de configuração.
+    
+    Usa o loader em C (libyaml) quando disponível, com SafeLoader puro como
+    fallback. O arquivo é aberto em bytes: o parser decodifica o UTF-8
+    diretamente, sem um buffer de texto intermediário. Arquivo vazio
+    resulta em dict vazio.
+    """
+    import yaml
+    
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, "rb") as f:
+        return yaml.load(f, Loader=loader) or {}
+
+
+def clear_api_key_cache() -> None:
+    """Descarta as API keys em cache (útil para testes ou após alterar o ambiente)."""
+    _api_key_cache.clear()
+
+
+@dataclass(slots=True)
 class OCRConfig:
     """Configurações do Tesseract OCR."""
     
@@ -26,9 +55,10 @@ class OCRConfig:
     language: str = "por"
     dpi: int = 300
     config: str = "--psm 3 --oem 3"
+    aggressive_denoise: bool = False  # fastNlMeansDenoising (lento) para scans ruins
 
 
-@dataclass
+@dataclass(slots=True)
 class LocalNLPConfig:
     """Configurações do processador NLP local."""
     
@@ -37,7 +67,7 @@ class LocalNLPConfig:
     similarity_threshold: float = 0.75
 
 
-@dataclass
+@dataclass(slots=True)
 class CloudNLPConfig:
     """Configurações do processador NLP em nuvem."""
     
@@ -50,11 +80,11 @@ class CloudNLPConfig:
     
     @property
     def api_key(self) -> Optional[str]:
-        """Obtém a API key do ambiente."""
-        return os.getenv(self.api_key_env)
+        """Obtém a API key do ambiente (lida uma vez e reaproveitada)."""
+        return _get_api_key(self.api_key_env)
 
 
-@dataclass
+@dataclass(slots=True)
 class NLPConfig:
     """Configurações gerais de NLP."""
     
@@ -68,7 +98,7 @@ class NLPConfig:
         return self.mode == "local"
 
 
-@dataclass
+@dataclass(slots=True)
 class ValidationConfig:
     """Configurações de validação de texto."""
     
@@ -78,7 +108,7 @@ class ValidationConfig:
     language_detection: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchConfig:
     """Configurações de busca."""
     
@@ -86,9 +116,11 @@ class SearchConfig:
     use_keyword_search: bool = True
     combine_results: bool = True
     max_results: int = 50
+    semantic_cache_similarity: float = 0.0
+    semantic_workers: int = 1
 
 
-@dataclass
+@dataclass(slots=True)
 class OutputConfig:
     """Configurações de saída."""
     
@@ -97,25 +129,35 @@ class OutputConfig:
     highlight_colors: Dict[str, List[int]] = field(default_factory=dict)
     highlight_opacity: float = 0.4
     output_format: str = "png"
+    jpeg_quality: int = 85
     create_summary: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class LegalTermsConfig:
     """Configurações de termos jurídicos."""
     
-    contract_types: List[str] = field(default_factory=list)
-    key_sections: List[str] = field(default_factory=list)
-    parties: List[str] = field(default_factory=list)
-    document_types: List[str] = field(default_factory=list)
-    heir_keywords: List[str] = field(default_factory=list)
-    administrator_keywords: List[str] = field(default_factory=list)
-    btg_keywords: List[str] = field(default_factory=list)
-    asset_types: List[str] = field(default_factory=list)
-    division_keywords: List[str] = field(default_factory=list)
-
-
-@dataclass
+    contract_types: Tuple[str, ...] = ()
+    key_sections: Tuple[str, ...] = ()
+    parties: Tuple[str, ...] = ()
+    document_types: Tuple[str, ...] = ()
+    heir_keywords: Tuple[str, ...] = ()
+    administrator_keywords: Tuple[str, ...] = ()
+    btg_keywords: Tuple[str, ...] = ()
+    asset_types: Tuple[str, ...] = ()
+    division_keywords: Tuple[str, ...] = ()
+    
+    def __post_init__(self):
+        # Listas vindas do YAML viram tuplas imutáveis de strings internadas,
+        # compartilhadas por todas as comparações feitas nos documentos
+        for f in fields(self):
+            terms = getattr(self, f.name)
+            if terms is None:
+                terms = ()
+            setattr(self, f.name, tuple(sys.intern(str(t)) for t in terms))
+
+
+@dataclass(slots=True)
 class CloudProviderConfig:
     """Configuração de um provedor cloud específico."""
     
@@ -127,13 +169,13 @@ class CloudProviderConfig:
     
     @property
     def api_key(self) -> Optional[str]:
-        """Obtém a API key do ambiente."""
+        """Obtém a API key do ambiente (lida uma vez e reaproveitada)."""
         if self.api_key_env:
-            return os.getenv(self.api_key_env)
+            return _get_api_key(self.api_key_env)
         return None
 
 
-@dataclass
+@dataclass(slots=True)
 class CloudProvidersConfig:
     """Configurações dos provedores cloud disponíveis."""
     
@@ -153,7 +195,7 @@ class CloudProvidersConfig:
     ))
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMExtractionConfig:
     """Configurações de extração via LLM (complementa regex)."""
     
@@ -171,7 +213,7 @@ class LLMExtractionConfig:
     extract_valores_por_extenso: bool = True    # "trinta mil reais" - LLM entende
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMSummarizationConfig:
     """Configurações de sumarização via LLM."""
     
@@ -180,7 +222,7 @@ class LLMSummarizationConfig:
     generate_insights: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class RAGGenerationConfig:
     """Configuracoes de geracao RAG."""
     
@@ -206,7 +248,7 @@ class RAGGenerationConfig:
     llm_summarization: LLMSummarizationConfig = field(default_factory=LLMSummarizationConfig)
 
 
-@dataclass
+@dataclass(slots=True)
 class RAGConfig:
     """Configurações do pipeline RAG."""
     
@@ -214,7 +256,7 @@ class RAGConfig:
     generation: RAGGenerationConfig = field(default_factory=RAGGenerationConfig)
 
 
-@dataclass
+@dataclass(slots=True)
 class AppConfig:
     """Configurações gerais do aplicativo."""
     
@@ -224,7 +266,7 @@ class AppConfig:
     log_level: str = "INFO"
 
 
-@dataclass
+@dataclass(slots=True)
 class Settings:
     """Configurações completas do aplicativo."""
     
@@ -241,111 +283,168 @@ class Settings:
     @classmethod
     def from_yaml(cls, config_path: Path) -> "Settings":
         """Carrega configurações de um arquivo YAML."""
-        with open(config_path, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f)
-        
-        return cls._from_dict(data)
+        return cls._from_dict(load_yaml(config_path))
     
     @classmethod
     def _from_dict(cls, data: Dict[str, Any]) -> "Settings":
         """Cria Settings a partir de um dicionário."""
         settings = cls()
         
-        # Carrega configuração de sistema (modo de operação)
+        # Seções aninhadas são montadas por _from_mapping a partir do
+        # schema das dataclasses
         if "system" in data:
-            system_data = data["system"]
-            online_config = OnlineConfig(**system_data.get("online", {}))
-            offline_config = OfflineConfig(**system_data.get("offline", {}))
-            hybrid_config = HybridConfig(**system_data.get("hybrid", {}))
-            settings.system = SystemConfig(
-                mode=system_data.get("mode", "offline"),
-                online=online_config,
-                offline=offline_config,
-                hybrid=hybrid_config
-            )
+            settings.system = _from_mapping(SystemConfig, data["system"])
         
         if "app" in data:
-            settings.app = AppConfig(**data["app"])
+            settings.app = _from_mapping(AppConfig, data["app"])
         
         if "ocr" in data:
-            settings.ocr = OCRConfig(**data["ocr"])
+            settings.ocr = _from_mapping(OCRConfig, data["ocr"])
         
         if "nlp" in data:
-            nlp_data = data["nlp"]
-            local_config = LocalNLPConfig(**nlp_data.get("local", {}))
-            cloud_config = CloudNLPConfig(**nlp_data.get("cloud", {}))
-            settings.nlp = NLPConfig(
-                mode=nlp_data.get("mode", "local"),
-                local=local_config,
-                cloud=cloud_config
-            )
+            settings.nlp = _from_mapping(NLPConfig, data["nlp"])
         
         if "validation" in data:
-            settings.validation = ValidationConfig(**data["validation"])
+            settings.validation = _from_mapping(ValidationConfig, data["validation"])
         
         if "search" in data:
-            settings.search = SearchConfig(**data["search"])
+            settings.search = _from_mapping(SearchConfig, data["search"])
         
         if "output" in data:
-            output_data = data["output"]
-            if "highlight_color" in output_data:
-                output_data["highlight_color"] = tuple(output_data["highlight_color"])
-            settings.output = OutputConfig(**output_data)
+            settings.output = _from_mapping(OutputConfig, data["output"])
         
         if "legal_terms" in data:
-            settings.legal_terms = LegalTermsConfig(**data["legal_terms"])
+            settings.legal_terms = _from_mapping(LegalTermsConfig, data["legal_terms"])
         
         if "rag" in data:
-            rag_data = data["rag"]
-            generation_data = rag_data.get("generation", {})
-            
-            # Parse cloud providers
-            cloud_providers_data = generation_data.get("cloud_providers", {})
-            openai_config = CloudProviderConfig(**cloud_providers_data.get("openai", {})) if "openai" in cloud_providers_data else CloudProviderConfig(
-                api_key_env="OPENAI_API_KEY",
-                embedding_model="text-embedding-3-small",
-                generation_model="gpt-4o-mini"
-            )
-            anthropic_config = CloudProviderConfig(**cloud_providers_data.get("anthropic", {})) if "anthropic" in cloud_providers_data else CloudProviderConfig(
-                api_key_env="ANTHROPIC_API_KEY",
-                generation_model="claude-3-haiku-20240307"
-            )
-            cloud_providers = CloudProvidersConfig(openai=openai_config, anthropic=anthropic_config)
-            
-            # Parse LLM extraction config
-            llm_extraction_data = generation_data.get("llm_extraction", {})
-            llm_extraction = LLMExtractionConfig(**llm_extraction_data) if llm_extraction_data else LLMExtractionConfig()
-            
-            # Parse LLM summarization config
-            llm_summarization_data = generation_data.get("llm_summarization", {})
-            llm_summarization = LLMSummarizationConfig(**llm_summarization_data) if llm_summarization_data else LLMSummarizationConfig()
-            
-            # Remove nested configs before passing to RAGGenerationConfig
-            gen_data_clean = {k: v for k, v in generation_data.items() 
-                           if k not in ["cloud_providers", "llm_extraction", "llm_summarization"]}
-            
-            generation_config = RAGGenerationConfig(
-                **gen_data_clean,
-                cloud_providers=cloud_providers,
-                llm_extraction=llm_extraction,
-                llm_summarization=llm_summarization
-            )
-            
-            settings.rag = RAGConfig(
-                enabled=rag_data.get("enabled", True),
-                generation=generation_config
-            )
+            settings.rag = _from_mapping(RAGConfig, data["rag"])
         
         return settings
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Converte configurações para dicionário."""
-        from dataclasses import asdict
-        return asdict(self)
+    def to_dict(self, shallow: bool = False) -> Dict[str, Any]:
+        """
+        Converte configurações para dicionário.
+        
+        Percorre os campos diretamente em vez de usar dataclasses.asdict,
+        que faz deepcopy de cada valor. Listas e dicts do resultado são
+        os mesmos objetos das configurações (não devem ser alterados).
+        
+        Args:
+            shallow: Se True, converte apenas o primeiro nível; as seções
+                    (OCRConfig, NLPConfig, ...) são retornadas como estão.
+        """
+        if shallow:
+            return dict(self.iter_items())
+        return _dataclass_to_dict(self)
+    
+    def iter_items(self) -> Iterator[Tuple[str, Any]]:
+        """Percorre os pares (seção, valor) sem montar um dict."""
+        for f in fields(self):
+            yield f.name, getattr(self, f.name)
+    
+    def to_yaml(self, stream: Optional[IO[str]] = None) -> Optional[str]:
+        """
+        Serializa as configurações em YAML.
+        
+        As dataclasses são entregues ao emissor campo a campo (sem o dict
+        intermediário de to_dict). Usa o dumper em C quando disponível.
+        
+        Args:
+            stream: Destino da escrita. Se None, retorna o YAML como str.
+        """
+        import yaml
+        
+        class _SettingsDumper(getattr(yaml, "CSafeDumper", yaml.SafeDumper)):
+            pass
+        
+        def represent_object(dumper, obj):
+            if is_dataclass(obj):
+                return dumper.represent_mapping(
+                    "tag:yaml.org,2002:map",
+                    ((f.name, getattr(obj, f.name)) for f in fields(obj)),
+                )
+            return dumper.represent_undefined(obj)
+        
+        _SettingsDumper.add_representer(tuple, _SettingsDumper.represent_list)
+        _SettingsDumper.add_multi_representer(object, represent_object)
+        
+        return yaml.dump(
+            self,
+            stream,
+            Dumper=_SettingsDumper,
+            allow_unicode=True,
+            sort_keys=False,
+        )
+
+
+@lru_cache(maxsize=None)
+def _field_types(cls: type) -> Dict[str, Any]:
+    """Tipos resolvidos dos campos (init) de uma dataclass."""
+    hints = get_type_hints(cls)
+    return {f.name: hints[f.name] for f in fields(cls) if f.init}
+
+
+def _from_mapping(cls: type, data: Optional[Dict[str, Any]]) -> Any:
+    """
+    Constrói a dataclass cls a partir de um dict do YAML.
+    
+    Campos cujo tipo é uma dataclass são construídos recursivamente,
+    listas viram tuplas em campos Tuple e chaves desconhecidas são
+    ignoradas. Campos ausentes (ou seções vazias) mantêm o default.
+    """
+    data = data or {}
+    kwargs = {}
+    
+    for name, field_type in _field_types(cls).items():
+        if name not in data:
+            continue
+        
+        value = data[name]
+        if is_dataclass(field_type):
+            if value is None:
+                continue
+            value = _from_mapping(field_type, value)
+        elif get_origin(field_type) is tuple and isinstance(value, list):
+            value = tuple(value)
+        
+        kwargs[name] = value
+    
+    return cls(**kwargs)
+
+
+def _dataclass_to_dict(obj: Any) -> Any:
+    """Converte dataclasses (recursivamente) em dicts, sem copiar valores."""
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: _dataclass_to_dict(getattr(obj, f.name)) for f in fields(obj)}
+    return obj
 
 
 # Singleton para configurações globais
 _settings: Optional[Settings] = None
+_settings_lock = threading.Lock()
+
+# Indica se o .env já foi lido neste processo
+_dotenv_loaded = False
+
+
+def _load_settings_file(config_path: Path) -> Settings:
+    """
+    Carrega Settings de um arquivo YAML, reaproveitando o resultado
+    enquanto o arquivo não for modificado (mesmo mtime e tamanho).
+    """
+    stat = config_path.stat()
+    return _load_settings(str(config_path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=8)
+def _load_settings(path_str: str, mtime_ns: int, size: int) -> Settings:
+    """
+    Constrói Settings para uma versão específica do arquivo.
+    
+    mtime_ns e size fazem parte da chave do lru_cache: quando o arquivo
+    muda, a chamada seguinte não encontra a entrada antiga e relê o YAML.
+    """
+    return Settings.from_yaml(Path(path_str))
 
 
 def get_settings(config_path: Optional[Path] = None) -> Settings:
@@ -359,25 +458,39 @@ def get_settings(config_path: Optional[Path] = None) -> Settings:
     Returns:
         Settings: Instância das configurações.
     """
-    global _settings
+    global _settings, _dotenv_loaded
     
-    # Carrega variáveis de ambiente
-    load_dotenv()
+    # Caminho rápido sem lock: singleton já criado
+    settings = _settings
+    if settings is not None and config_path is None:
+        return settings
     
-    if _settings is None or config_path is not None:
-        if config_path is None:
-            # Procura config.yaml no diretório do projeto
-            config_path = Path(__file__).parent.parent.parent / "config.yaml"
+    with _settings_lock:
+        # Carrega variáveis de ambiente (uma única vez por processo)
+        if not _dotenv_loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _dotenv_loaded = True
         
-        if config_path.exists():
-            _settings = Settings.from_yaml(config_path)
-        else:
-            _settings = Settings()
-    
-    return _settings
+        if _settings is None or config_path is not None:
+            if config_path is None:
+                # Procura config.yaml no diretório do projeto
+                config_path = Path(__file__).parent.parent.parent / "config.yaml"
+            
+            if config_path.exists():
+                # Cópia do objeto memorizado: quem altera as configurações
+                # (ex.: settings.nlp.mode na CLI) não contamina o cache
+                _settings = copy.deepcopy(_load_settings_file(config_path))
+            else:
+                _settings = Settings()
+        
+        return _settings
 
 
 def reset_settings() -> None:
     """Reseta as configurações globais (útil para testes)."""
     global _settings
-    _settings = None
+    with _settings_lock:
+        _settings = None
+        _load_settings.cache_clear()
+        clear_api_key_cache()
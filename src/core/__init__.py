@@ -6,13 +6,6 @@ from .text_validator import TextValidator
 from .instruction_parser import InstructionParser
 from .text_searcher import TextSearcher
 from .output_generator import OutputGenerator
-from .ocr_cache import (
-    OCRCache,
-    OCRCacheEntry,
-    CachedDocument,
-    get_ocr_cache,
-    init_ocr_cache,
-)
 
 __all__ = [
     "PDFReader",
@@ -27,3 +20,25 @@ __all__ = [
     "get_ocr_cache",
     "init_ocr_cache",
 ]
+
+
+# Membros de ocr_cache carregados sob demanda (PEP 562)
+_OCR_CACHE_MEMBERS = frozenset({
+    "OCRCache",
+    "OCRCacheEntry",
+    "CachedDocument",
+    "get_ocr_cache",
+    "init_ocr_cache",
+})
+
+
+def __getattr__(name: str):
+    """
+    Carrega os membros de ocr_cache apenas no primeiro acesso.
+
+    Quem nao usa o cache de OCR nao paga a importacao do modulo.
+    """
+    if name in _OCR_CACHE_MEMBERS:
+        from . import ocr_cache
+        return getattr(ocr_cache, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
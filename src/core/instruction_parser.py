@@ -5,15 +5,25 @@ from __future__ import annotations
 import logging
 import re
 from dataclasses import dataclass, field
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Optional, Set
+from typing import List, Optional, Tuple
 
 from config.settings import Settings, get_settings
 
 logger = logging.getLogger(__name__)
 
+# Palavras comuns que não agregam à query semântica
+_STOPWORDS = frozenset({
+    "encontrar", "localizar", "buscar", "procurar", "identificar",
+    "verificar", "checar", "analisar", "o", "a", "os", "as", "de",
+    "do", "da", "dos", "das", "em", "no", "na", "nos", "nas", "que",
+    "qual", "quais", "onde", "como", "se", "para", "com", "sem"
+})
 
-@dataclass
+
+@dataclass(slots=True)
 class Instruction:
     """Representa uma instrução de busca parseada."""
     
@@ -32,7 +42,7 @@ class Instruction:
         return self.raw_text
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedInstructions:
     """Conjunto de instruções parseadas."""
     
@@ -59,6 +69,9 @@ class InstructionParser:
     estruturas de busca otimizadas.
     """
     
+    # Máximo de instruções distintas memorizadas por parser
+    ANALYSIS_CACHE_SIZE = 4096
+    
     # Padrões de marcadores de bullets
     BULLET_PATTERNS = [
         r"^\s*[-•*]\s*",           # - bullet, • bullet, * bullet
@@ -69,11 +82,11 @@ class InstructionParser:
     ]
     
     # Palavras que indicam obrigatoriedade
-    REQUIRED_MARKERS = {
+    REQUIRED_MARKERS = frozenset({
         "obrigatório", "obrigatoriamente", "deve", "devem",
         "precisa", "precisam", "necessário", "essencial",
         "importante", "crítico", "fundamental"
-    }
+    })
     
     # Categorias de instruções para contratos de locação
     CATEGORY_KEYWORDS = {
@@ -94,9 +107,69 @@ class InstructionParser:
             settings: Configurações do aplicativo.
         """
         self.settings = settings or get_settings()
-        self._compiled_bullets = [
-            re.compile(p, re.MULTILINE) for p in self.BULLET_PATTERNS
+        
+        # Termos jurídicos com a forma minúscula já calculada (constantes
+        # das configurações, consultadas a cada instrução)
+        legal_terms = self.settings.legal_terms
+        self._legal_terms = [
+            (term, term.lower())
+            for term in (*legal_terms.key_sections, *legal_terms.parties)
         ]
+        self._legal_automaton = self._build_legal_automaton()
+        
+        # Os marcadores viram grupos opcionais de uma única regex, na mesma
+        # ordem de BULLET_PATTERNS (equivale a aplicá-los em sequência).
+        # Com MULTILINE e espaços sem quebra de linha ([^\S\n]), uma única
+        # varredura do texto extrai o conteúdo de todas as linhas
+        bullets = "".join(
+            f"(?:{p.removeprefix('^')})?".replace(r"\s", r"[^\S\n]")
+            for p in self.BULLET_PATTERNS
+        )
+        self._line_re = re.compile(
+            rf"^[^\S\n]*{bullets}[^\S\n]*(.*?)[^\S\n]*$", re.MULTILINE
+        )
+        # Uma alternação por categoria: a busca das palavras-chave roda no
+        # motor de regex em vez de um laço Python por palavra
+        self._category_patterns = {
+            category: re.compile(
+                "|".join(re.escape(kw) for kw in keywords), re.IGNORECASE
+            )
+            for category, keywords in self.CATEGORY_KEYWORDS.items()
+        }
+        self._required_re = re.compile(
+            "|".join(re.escape(m) for m in self.REQUIRED_MARKERS), re.IGNORECASE
+        )
+        # Texto entre aspas duplas ou simples, em uma única passada
+        self._quoted_re = re.compile(r'"([^"]+)"|\'([^\']+)\'')
+        self._capitalized_re = re.compile(r'\b[A-Z][a-záéíóúâêîôûãõç]+\b')
+        
+        # Memo por texto da instrução (limitado a ANALYSIS_CACHE_SIZE linhas)
+        self._analyze_cached = lru_cache(maxsize=self.ANALYSIS_CACHE_SIZE)(self._analyze)
+    
+    def _build_legal_automaton(self):
+        """
+        Monta um autômato Aho-Corasick com os termos jurídicos.
+        
+        Permite localizar todos os termos em uma única passada pelo texto.
+        Retorna None se pyahocorasick não estiver instalado (ou se não
+        houver termos), caso em que a busca termo a termo é usada.
+        """
+        if not self._legal_terms:
+            return None
+        
+        try:
+            import ahocorasick
+        except ImportError:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for index, (_, term_lower) in enumerate(self._legal_terms):
+            # Termos que coincidem em minúsculas ficam com a primeira
+            # grafia/posição, como na busca termo a termo
+            if term_lower not in automaton:
+                automaton.add_word(term_lower, index)
+        automaton.make_automaton()
+        return automaton
     
     def parse_file(self, file_path: Path) -> ParsedInstructions:
         """
@@ -136,43 +209,19 @@ class InstructionParser:
         Returns:
             ParsedInstructions: Instruções parseadas.
         """
-        result = ParsedInstructions()
-        
-        # Divide por linhas
-        lines = text.strip().split("\n")
-        
-        for line in lines:
-            line = line.strip()
-            
-            if not line:
-                continue
-            
-            # Remove marcador de bullet
-            clean_line = self._remove_bullet_marker(line)
-            
-            if clean_line and len(clean_line) > 2:
-                instruction = self._parse_single_instruction(clean_line)
-                result.instructions.append(instruction)
+        # Laço único sobre as linhas: o conteúdo já vem sem marcador e sem
+        # espaços, e o parse de cada linha é resolvido em uma só expressão
+        parse = self._parse_single_instruction
+        result = ParsedInstructions(instructions=[
+            parse(line)
+            for line in map(itemgetter(1), self._line_re.finditer(text))
+            if len(line) > 2
+        ])
         
         logger.info(f"Parseadas {result.count} instruções")
         
         return result
     
-    def _remove_bullet_marker(self, line: str) -> str:
-        """
-        Remove marcador de bullet da linha.
-        
-        Args:
-            line: Linha de texto.
-        
-        Returns:
-            str: Linha sem marcador.
-        """
-        for pattern in self._compiled_bullets:
-            line = pattern.sub("", line)
-        
-        return line.strip()
-    
     def _parse_single_instruction(self, text: str) -> Instruction:
         """
         Parseia uma única instrução.
@@ -183,21 +232,28 @@ class InstructionParser:
         Returns:
             Instruction: Instrução parseada.
         """
-        instruction = Instruction(raw_text=text)
-        
-        # Extrai termos de busca
-        instruction.search_terms = self._extract_search_terms(text)
-        
-        # Cria query semântica
-        instruction.semantic_query = self._create_semantic_query(text)
-        
-        # Verifica se é obrigatório
-        instruction.is_required = self._check_required(text)
-        
-        # Determina categoria
-        instruction.category = self._determine_category(text)
+        search_terms, semantic_query, is_required, category = self._analyze_cached(text)
+        return Instruction(
+            raw_text=text,
+            search_terms=list(search_terms),
+            semantic_query=semantic_query,
+            is_required=is_required,
+            category=category,
+        )
+    
+    def _analyze(self, text: str) -> Tuple[Tuple[str, ...], str, bool, str]:
+        """
+        Extrai termos, query, obrigatoriedade e categoria de uma instrução.
         
-        return instruction
+        Usado via _analyze_cached: linhas repetidas (modelos, trechos
+        copiados) são analisadas uma única vez por parser.
+        """
+        return (
+            tuple(self._extract_search_terms(text)),
+            self._create_semantic_query(text),
+            self._check_required(text),
+            self._determine_category(text),
+        )
     
     def _extract_search_terms(self, text: str) -> List[str]:
         """
@@ -213,37 +269,27 @@ class InstructionParser:
         text_lower = text.lower()
         
         # Adiciona termos jurídicos conhecidos
-        legal_terms = self.settings.legal_terms
-        
-        for term in legal_terms.key_sections:
-            if term.lower() in text_lower:
-                terms.append(term)
-        
-        for term in legal_terms.parties:
-            if term.lower() in text_lower:
-                terms.append(term)
+        if self._legal_automaton is not None:
+            # Índices ordenados preservam a ordem das configurações
+            found = {index for _, index in self._legal_automaton.iter(text_lower)}
+            terms.extend(self._legal_terms[index][0] for index in sorted(found))
+        else:
+            for term, term_lower in self._legal_terms:
+                if term_lower in text_lower:
+                    terms.append(term)
         
         # Extrai palavras entre aspas
-        quoted = re.findall(r'"([^"]+)"', text)
-        terms.extend(quoted)
-        
-        quoted_single = re.findall(r"'([^']+)'", text)
-        terms.extend(quoted_single)
+        for match in self._quoted_re.finditer(text):
+            terms.append(match.group(1) or match.group(2))
         
         # Extrai substantivos importantes (palavras capitalizadas)
-        capitalized = re.findall(r'\b[A-Z][a-záéíóúâêîôûãõç]+\b', text)
-        terms.extend(capitalized)
-        
-        # Remove duplicatas mantendo ordem
-        seen: Set[str] = set()
-        unique = []
-        for term in terms:
-            term_lower = term.lower()
-            if term_lower not in seen:
-                seen.add(term_lower)
-                unique.append(term)
-        
-        return unique
+        terms.extend(self._capitalized_re.findall(text))
+        
+        # Remove duplicatas (sem diferenciar maiúsculas) mantendo a ordem e a
+        # primeira grafia de cada termo; os laços rodam em C (dict/zip/map)
+        lowered = list(map(str.lower, terms))
+        first_spelling = dict(zip(reversed(lowered), reversed(terms)))
+        return [first_spelling[key] for key in dict.fromkeys(lowered)]
     
     def _create_semantic_query(self, text: str) -> str:
         """
@@ -256,15 +302,8 @@ class InstructionParser:
             str: Query semântica otimizada.
         """
         # Remove palavras comuns que não agregam à busca
-        stopwords = {
-            "encontrar", "localizar", "buscar", "procurar", "identificar",
-            "verificar", "checar", "analisar", "o", "a", "os", "as", "de",
-            "do", "da", "dos", "das", "em", "no", "na", "nos", "nas", "que",
-            "qual", "quais", "onde", "como", "se", "para", "com", "sem"
-        }
-        
         words = text.lower().split()
-        filtered = [w for w in words if w not in stopwords and len(w) > 2]
+        filtered = [w for w in words if w not in _STOPWORDS and len(w) > 2]
         
         return " ".join(filtered)
     
@@ -278,13 +317,7 @@ class InstructionParser:
         Returns:
             bool: True se obrigatório.
         """
-        text_lower = text.lower()
-        
-        for marker in self.REQUIRED_MARKERS:
-            if marker in text_lower:
-                return True
-        
-        return False
+        return self._required_re.search(text) is not None
     
     def _determine_category(self, text: str) -> str:
         """
@@ -296,19 +329,17 @@ class InstructionParser:
         Returns:
             str: Categoria identificada.
         """
-        text_lower = text.lower()
-        
-        category_scores = {}
-        
-        for category, keywords in self.CATEGORY_KEYWORDS.items():
-            score = sum(1 for kw in keywords if kw in text_lower)
-            if score > 0:
-                category_scores[category] = score
+        best_category = "general"
+        best_score = 0
         
-        if category_scores:
-            return max(category_scores, key=category_scores.get)
+        for category, pattern in self._category_patterns.items():
+            # Pontua pelo número de palavras-chave distintas encontradas
+            score = len({m.lower() for m in pattern.findall(text)})
+            if score > best_score:
+                best_category = category
+                best_score = score
         
-        return "general"
+        return best_category
     
     def create_example_file(self, output_path: Path) -> None:
         """
@@ -4,8 +4,9 @@ Cache de Extracao OCR.
 Armazena o texto extraido de documentos PDF para evitar
 reprocessamento custoso do OCR.
 
-O cache usa hash SHA-256 do conteudo do PDF para identificacao
-unica, garantindo que alteracoes no documento invalidem o cache.
+O cache usa hash do conteudo do PDF (BLAKE3 quando disponivel,
+senao SHA-256) para identificacao unica, garantindo que alteracoes
+no documento invalidem o cache.
 """
 
 from __future__ import annotations
@@ -14,13 +15,188 @@ import hashlib
 import json
 import logging
 import os
-from dataclasses import dataclass, field, asdict
-from datetime import datetime
+import sqlite3
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import cached_property
+from operator import attrgetter
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson e opcional; usa json da stdlib
+    orjson = None
+
+try:
+    import blake3
+except ImportError:  # blake3 e opcional; usa SHA-256 do hashlib
+    blake3 = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack e opcional; documentos ficam em JSON
+    msgpack = None
 
 logger = logging.getLogger(__name__)
 
+# Tamanho do bloco de leitura no calculo do hash (fallback sem file_digest)
+HASH_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Arquivos grandes: hash em arvore (SHA-256 de blocos de 8 MiB em paralelo)
+PARALLEL_HASH_THRESHOLD = 64 << 20  # 64 MiB
+PARALLEL_HASH_CHUNK_SIZE = 8 << 20  # 8 MiB
+HASH_SCHEME_FLAT = "sha256"
+HASH_SCHEME_TREE = "sha256-tree-8m"
+
+# BLAKE3 (SIMD e multithread, bem mais rapido que SHA-256), truncado em
+# 128 bits: suficiente para chave de um cache local
+HASH_SCHEME_BLAKE3 = "blake3-128"
+BLAKE3_DIGEST_SIZE = 16
+
+# Maximo de hashes de arquivo memorizados por instancia do cache
+HASH_MEMO_SIZE = 256
+
+# Indice do cache em SQLite (WAL): cada alteracao grava so a linha afetada
+INDEX_DB_NAME = "index.sqlite"
+LEGACY_INDEX_NAME = "index.json"
+_INDEX_COLUMNS = (
+    "file_hash", "file_name", "file_size", "num_pages", "total_words",
+    "extracted_at", "extraction_time_seconds", "cache_file", "metadata",
+)
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    file_hash TEXT PRIMARY KEY,
+    file_name TEXT NOT NULL,
+    file_size INTEGER,
+    num_pages INTEGER,
+    total_words INTEGER,
+    extracted_at TEXT,
+    extraction_time_seconds REAL,
+    cache_file TEXT,
+    metadata BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_entries_name ON entries(file_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_entries_age ON entries(extracted_at);
+"""
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serializa em JSON compacto (UTF-8), com orjson quando disponivel."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    """Desserializa JSON, com orjson quando disponivel."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _encode_document(data: Dict[str, Any]) -> Tuple[str, bytes]:
+    """
+    Serializa um documento em cache.
+    
+    Usa msgpack (binario, mais compacto) quando disponivel; caso
+    contrario JSON compacto.
+    
+    Returns:
+        (extensao do arquivo, conteudo)
+    """
+    if msgpack is not None:
+        return ".mpk", msgpack.packb(data, use_bin_type=True)
+    return ".json", _json_dumps(data)
+
+
+def _decode_document(cache_file: Path) -> Dict[str, Any]:
+    """Le um documento em cache, escolhendo o formato pela extensao."""
+    raw = cache_file.read_bytes()
+    if cache_file.suffix == ".mpk":
+        if msgpack is None:
+            raise RuntimeError("msgpack nao instalado para ler o cache")
+        return msgpack.unpackb(raw, raw=False)
+    return _json_loads(raw)
+
+
+def _join_pages_text(pages: List[Dict[str, Any]]) -> str:
+    """Texto completo do documento (paginas separadas por linha em branco)."""
+    return "\n\n".join(p.get("text", "") for p in pages)
+
+
+_UPSERT_SQL = (
+    f"INSERT OR REPLACE INTO entries ({', '.join(_INDEX_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(_INDEX_COLUMNS))})"
+)
+
+
+def _entry_to_row(entry: "OCRCacheEntry") -> tuple:
+    """Converte uma entrada do indice em linha da tabela entries."""
+    return (
+        entry.file_hash, entry.file_name, entry.file_size, entry.num_pages,
+        entry.total_words, entry.extracted_at, entry.extraction_time_seconds,
+        entry.cache_file, _json_dumps(entry.metadata),
+    )
+
+
+def _entry_from_row(row: tuple) -> "OCRCacheEntry":
+    """Reconstroi uma entrada do indice a partir de uma linha da tabela."""
+    values = dict(zip(_INDEX_COLUMNS, row))
+    values["metadata"] = _json_loads(values["metadata"]) if values["metadata"] else {}
+    return OCRCacheEntry(**values)
+
+
+def _sha256_digest(data: bytes) -> bytes:
+    """SHA-256 (digest binario) de um bloco."""
+    return hashlib.sha256(data).digest()
+
+
+@contextmanager
+def _open_for_hashing(
+    file_path: Path,
+    buffered: bool = True
+) -> Iterator[IO[bytes]]:
+    """
+    Abre o arquivo para uma leitura sequencial unica.
+    
+    Onde ha posix_fadvise (Linux), pede readahead agressivo ao abrir e
+    descarta as paginas lidas ao final, para o PDF hasheado nao expulsar
+    do page cache dados que serao relidos (como os arquivos do cache).
+    
+    Com buffered=False devolve o arquivo cru (FileIO): quem le com
+    readinto no proprio buffer evita a copia extra do BufferedReader.
+    """
+    with open(file_path, 'rb', buffering=-1 if buffered else 0) as f:
+        _fadvise(f, "POSIX_FADV_SEQUENTIAL")
+        try:
+            yield f
+        finally:
+            _fadvise(f, "POSIX_FADV_DONTNEED")
+
+
+def _fadvise(f: IO[bytes], advice_name: str) -> None:
+    """Aplica posix_fadvise ao arquivo inteiro, se a plataforma suportar."""
+    advice = getattr(os, advice_name, None)
+    if advice is None:
+        return
+    try:
+        os.posix_fadvise(f.fileno(), 0, 0, advice)
+    except OSError:
+        pass
+
+
+def hash_scheme(file_size: int) -> str:
+    """Esquema de hash usado para um arquivo do tamanho informado."""
+    if blake3 is not None:
+        return HASH_SCHEME_BLAKE3
+    if file_size > PARALLEL_HASH_THRESHOLD:
+        return HASH_SCHEME_TREE
+    return HASH_SCHEME_FLAT
+
 
 @dataclass
 class OCRCacheEntry:
@@ -37,7 +213,18 @@ class OCRCacheEntry:
     metadata: Dict[str, Any] = field(default_factory=dict)
     
     def to_dict(self) -> dict:
-        return asdict(self)
+        # Dict literal em vez de asdict(): sem copia profunda de metadata
+        return {
+            "file_name": self.file_name,
+            "file_hash": self.file_hash,
+            "file_size": self.file_size,
+            "num_pages": self.num_pages,
+            "total_words": self.total_words,
+            "extracted_at": self.extracted_at,
+            "extraction_time_seconds": self.extraction_time_seconds,
+            "cache_file": self.cache_file,
+            "metadata": self.metadata,
+        }
     
     @classmethod
     def from_dict(cls, data: dict) -> "OCRCacheEntry":
@@ -58,14 +245,27 @@ class CachedDocument:
     file_name: str
     file_hash: str
     pages: List[Dict[str, Any]]  # [{"number": 1, "text": "..."}, ...]
-    full_text: str
     metadata: Dict[str, Any] = field(default_factory=dict)
     
+    @cached_property
+    def full_text(self) -> str:
+        """Texto completo, montado a partir das paginas so quando pedido."""
+        return _join_pages_text(self.pages)
+    
     def to_dict(self) -> dict:
-        return asdict(self)
+        # Compartilha pages/metadata (asdict copiaria cada pagina)
+        return {
+            "file_name": self.file_name,
+            "file_hash": self.file_hash,
+            "pages": self.pages,
+            "metadata": self.metadata,
+        }
     
     @classmethod
     def from_dict(cls, data: dict) -> "CachedDocument":
+        # Arquivos de versoes anteriores ainda trazem full_text: e ignorado
+        if "full_text" in data:
+            data = {k: v for k, v in data.items() if k != "full_text"}
         return cls(**data)
 
 
@@ -80,6 +280,9 @@ class OCRCache:
     - Verifica validade do cache
     """
     
+    # Indices ja lidos no processo: caminho do banco -> (assinatura, entradas)
+    _loaded_indexes: Dict[str, Tuple[tuple, Dict[str, OCRCacheEntry]]] = {}
+    
     def __init__(
         self,
         cache_dir: Optional[Path] = None,
@@ -97,8 +300,10 @@ class OCRCache:
         self.cache_dir = cache_dir or Path("./cache/ocr")
         self.max_age_hours = max_age_hours
         self.enabled = enabled
-        self._index_file = self.cache_dir / "index.json"
+        self._db_file = self.cache_dir / INDEX_DB_NAME
+        self._db: Optional[sqlite3.Connection] = None
         self._index: Dict[str, OCRCacheEntry] = {}
+        self._hash_memo: OrderedDict[Tuple[str, int, int], str] = OrderedDict()
         
         if self.enabled:
             self._ensure_cache_dir()
@@ -109,33 +314,140 @@ class OCRCache:
         self.cache_dir.mkdir(parents=True, exist_ok=True)
     
     def _load_index(self) -> None:
-        """Carrega indice do cache."""
-        if self._index_file.exists():
+        """Abre o indice SQLite (migrando um index.json antigo) e o carrega."""
+        # Sem banco (nem conexao, nem schema) o cache fica so em memoria
+        try:
+            db = sqlite3.connect(
+                self._db_file, isolation_level=None, check_same_thread=False
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao abrir indice do cache: {e}")
+            return
+        
+        try:
+            # WAL e apenas otimizacao: um "database is locked" aqui nao
+            # impede o uso do indice
             try:
-                with open(self._index_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self._index = {
-                        k: OCRCacheEntry.from_dict(v)
-                        for k, v in data.items()
-                    }
-                logger.debug(f"Indice do cache carregado: {len(self._index)} entradas")
-            except Exception as e:
-                logger.warning(f"Erro ao carregar indice do cache: {e}")
-                self._index = {}
-    
-    def _save_index(self) -> None:
-        """Salva indice do cache."""
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("PRAGMA synchronous=NORMAL")
+            except sqlite3.Error as e:
+                logger.debug(f"Indice do cache sem WAL: {e}")
+            db.executescript(_INDEX_SCHEMA)
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao preparar indice do cache: {e}")
+            db.close()
+            return
+        
+        self._db = db
+        self._migrate_legacy_index()
+        
+        # Reaproveita o indice ja lido neste processo se os arquivos do
+        # banco nao mudaram desde entao
+        cached = OCRCache._loaded_indexes.get(str(self._db_file))
+        if cached is not None and cached[0] == self._index_signature():
+            self._index = dict(cached[1])
+            return
+        
         try:
-            with open(self._index_file, 'w', encoding='utf-8') as f:
-                data = {k: v.to_dict() for k, v in self._index.items()}
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            rows = self._db.execute(
+                f"SELECT {', '.join(_INDEX_COLUMNS)} FROM entries"
+            )
+            self._index = {row[0]: _entry_from_row(row) for row in rows}
         except Exception as e:
+            # O banco continua em uso: novas entradas seguem sendo gravadas
+            logger.warning(f"Erro ao carregar indice do cache: {e}")
+            self._index = {}
+            return
+        
+        self._remember_index()
+        logger.debug(f"Indice do cache carregado: {len(self._index)} entradas")
+    
+    def _index_signature(self) -> tuple:
+        """(mtime, tamanho) do banco e do WAL: muda a cada escrita."""
+        signature = []
+        for path in (self._db_file, self._db_file.with_name(INDEX_DB_NAME + "-wal")):
+            try:
+                stat = path.stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+    
+    def _remember_index(self) -> None:
+        """Guarda uma copia do indice atual para outras instancias."""
+        OCRCache._loaded_indexes[str(self._db_file)] = (
+            self._index_signature(), dict(self._index)
+        )
+    
+    def _migrate_legacy_index(self) -> None:
+        """
+        Importa o index.json de versoes anteriores e o remove.
+        
+        Um index.json corrompido (ou com entradas invalidas) e renomeado
+        para index.json.bad, para nao falhar de novo a cada execucao; o
+        cache segue com o indice SQLite.
+        """
+        legacy_file = self.cache_dir / LEGACY_INDEX_NAME
+        if not legacy_file.exists():
+            return
+        
+        try:
+            data = _json_loads(legacy_file.read_bytes())
+            with self._db:
+                self._db.executemany(
+                    _UPSERT_SQL,
+                    (_entry_to_row(OCRCacheEntry.from_dict(v)) for v in data.values())
+                )
+        except Exception as e:
+            bad_file = legacy_file.with_name(LEGACY_INDEX_NAME + ".bad")
+            logger.warning(
+                f"Erro ao migrar indice antigo do cache ({e}); "
+                f"arquivo renomeado para {bad_file.name}"
+            )
+            try:
+                legacy_file.replace(bad_file)
+            except OSError as rename_error:
+                logger.warning(f"Erro ao renomear {legacy_file}: {rename_error}")
+            return
+        
+        legacy_file.unlink()
+        logger.info(f"Indice do cache migrado para SQLite: {len(data)} entradas")
+    
+    def _store_entry(self, entry: OCRCacheEntry) -> None:
+        """Grava (insere ou substitui) uma entrada no indice."""
+        if self._db is None:
+            return
+        try:
+            self._db.execute(_UPSERT_SQL, _entry_to_row(entry))
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao salvar indice do cache: {e}")
+            return
+        self._remember_index()
+    
+    def _delete_entries(self, file_hashes: List[str]) -> None:
+        """Remove entradas do indice (todas ou nenhuma)."""
+        if self._db is None or not file_hashes:
+            return
+        try:
+            with self._db:
+                self._db.executemany(
+                    "DELETE FROM entries WHERE file_hash = ?",
+                    ((h,) for h in file_hashes)
+                )
+        except sqlite3.Error as e:
             logger.warning(f"Erro ao salvar indice do cache: {e}")
+            return
+        self._remember_index()
     
     @staticmethod
     def calculate_file_hash(file_path: Path) -> str:
         """
-        Calcula hash SHA-256 do arquivo.
+        Calcula o hash do arquivo conforme hash_scheme().
+        
+        BLAKE3 quando instalado (arquivo mapeado em memoria e hasheado em
+        varias threads pela propria biblioteca); senao SHA-256, em arvore
+        para arquivos grandes. Os esquemas geram chaves diferentes, entao
+        trocar de esquema apenas invalida as entradas antigas.
         
         Args:
             file_path: Caminho do arquivo
@@ -143,48 +455,127 @@ class OCRCache:
         Returns:
             Hash em hexadecimal
         """
-        sha256 = hashlib.sha256()
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
-                sha256.update(chunk)
-        return sha256.hexdigest()
+        scheme = hash_scheme(os.path.getsize(file_path))
+        if scheme == HASH_SCHEME_BLAKE3:
+            with _open_for_hashing(file_path):
+                hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+                hasher.update_mmap(file_path)
+            return hasher.hexdigest(length=BLAKE3_DIGEST_SIZE)
+        if scheme == HASH_SCHEME_TREE:
+            return OCRCache.calculate_file_hash_parallel(file_path)
+        
+        # Leitura sem buffer do Python: file_digest (ou o laco abaixo) ja
+        # faz readinto em um buffer proprio, reaproveitado a cada bloco
+        with _open_for_hashing(file_path, buffered=False) as f:
+            if hasattr(hashlib, "file_digest"):
+                # Python 3.11+: leitura e hash feitos inteiramente em C
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            
+            sha256 = hashlib.sha256()
+            buffer = memoryview(bytearray(HASH_CHUNK_SIZE))
+            while n := f.readinto(buffer):
+                sha256.update(buffer[:n])
+            return sha256.hexdigest()
+    
+    @staticmethod
+    def calculate_file_hash_parallel(
+        file_path: Path,
+        chunk_size: int = PARALLEL_HASH_CHUNK_SIZE,
+        workers: Optional[int] = None
+    ) -> str:
+        """
+        Calcula hash em arvore: SHA-256 dos digests SHA-256 de cada bloco.
+        
+        Os blocos sao lidos em sequencia e hasheados em threads (o OpenSSL
+        libera o GIL), limitando os blocos em memoria a 2x o numero de
+        workers. O resultado difere do SHA-256 simples do arquivo.
+        
+        Args:
+            file_path: Caminho do arquivo
+            chunk_size: Tamanho de cada bloco em bytes
+            workers: Numero de threads (padrao: os.cpu_count())
+        
+        Returns:
+            Hash em hexadecimal
+        """
+        workers = workers or os.cpu_count() or 1
+        digests: List[bytes] = []
+        pending: deque = deque()
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            with _open_for_hashing(file_path) as f:
+                while chunk := f.read(chunk_size):
+                    pending.append(executor.submit(_sha256_digest, chunk))
+                    if len(pending) >= 2 * workers:
+                        digests.append(pending.popleft().result())
+            digests.extend(future.result() for future in pending)
+        
+        return hashlib.sha256(b"".join(digests)).hexdigest()
     
     def get_cache_key(self, file_path: Path) -> str:
-        """Gera chave do cache baseada no hash do arquivo."""
-        return self.calculate_file_hash(file_path)
+        """
+        Gera chave do cache baseada no hash do arquivo.
+        
+        O hash e memorizado por (caminho, mtime, tamanho): enquanto o
+        arquivo nao mudar, chamadas repetidas nao releem o PDF.
+        """
+        stat = os.stat(file_path)
+        memo_key = (str(file_path), stat.st_mtime_ns, stat.st_size)
+        
+        file_hash = self._hash_memo.get(memo_key)
+        if file_hash is not None:
+            self._hash_memo.move_to_end(memo_key)
+            return file_hash
+        
+        file_hash = self.calculate_file_hash(file_path)
+        self._hash_memo[memo_key] = file_hash
+        if len(self._hash_memo) > HASH_MEMO_SIZE:
+            self._hash_memo.popitem(last=False)
+        return file_hash
     
-    def has_cache(self, file_path: Path) -> bool:
+    def _lookup(self, file_path: Path) -> Tuple[str, Optional[OCRCacheEntry]]:
         """
-        Verifica se existe cache valido para o arquivo.
+        Calcula o hash do arquivo e localiza sua entrada valida no cache.
         
         Args:
             file_path: Caminho do PDF
         
         Returns:
-            True se existe cache valido
+            (hash do arquivo, entrada ou None se ausente/expirada/sem arquivo)
         """
-        if not self.enabled:
-            return False
-        
         file_hash = self.get_cache_key(file_path)
+        entry = self._index.get(file_hash)
         
-        if file_hash not in self._index:
-            return False
-        
-        entry = self._index[file_hash]
+        if entry is None:
+            return file_hash, None
         
         # Verifica idade
         if entry.age_hours > self.max_age_hours:
             logger.debug(f"Cache expirado para {file_path.name}")
-            return False
+            return file_hash, None
         
         # Verifica se arquivo de cache existe
         cache_file = self.cache_dir / entry.cache_file
         if not cache_file.exists():
             logger.debug(f"Arquivo de cache nao encontrado: {entry.cache_file}")
+            return file_hash, None
+        
+        return file_hash, entry
+    
+    def has_cache(self, file_path: Path) -> bool:
+        """
+        Verifica se existe cache valido para o arquivo.
+        
+        Args:
+            file_path: Caminho do PDF
+        
+        Returns:
+            True se existe cache valido
+        """
+        if not self.enabled:
             return False
         
-        return True
+        return self._lookup(file_path)[1] is not None
     
     def get(self, file_path: Path) -> Optional[CachedDocument]:
         """
@@ -196,19 +587,66 @@ class OCRCache:
         Returns:
             CachedDocument ou None se nao encontrado
         """
-        if not self.has_cache(file_path):
+        if not self.enabled:
             return None
         
-        file_hash = self.get_cache_key(file_path)
-        entry = self._index[file_hash]
+        _, entry = self._lookup(file_path)
+        if entry is None:
+            return None
+        
+        return self._read_document(file_path, entry)
+    
+    def bulk_get(
+        self,
+        file_paths: List[Path],
+        workers: Optional[int] = None
+    ) -> Dict[Path, Optional[CachedDocument]]:
+        """
+        Obtem varios documentos do cache de uma vez.
+        
+        As leituras dos arquivos de cache sao disparadas juntas em threads
+        (a leitura libera o GIL), sobrepondo a latencia de disco em vez de
+        pagar uma leitura por vez como em chamadas seguidas a get().
+        
+        Args:
+            file_paths: Caminhos dos PDFs
+            workers: Numero de threads (padrao: min(32, cpu_count + 4))
+        
+        Returns:
+            Dicionario caminho -> CachedDocument (ou None se nao encontrado)
+        """
+        if not self.enabled:
+            return {path: None for path in file_paths}
+        
+        lookups = {path: self._lookup(path)[1] for path in file_paths}
+        hits = [(path, entry) for path, entry in lookups.items() if entry is not None]
+        
+        documents: Dict[Path, Optional[CachedDocument]] = dict.fromkeys(lookups)
+        if len(hits) < 2:
+            for path, entry in hits:
+                documents[path] = self._read_document(path, entry)
+            return documents
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(lambda hit: self._read_document(*hit), hits)
+            for (path, _), doc in zip(hits, results):
+                documents[path] = doc
+        
+        return documents
+    
+    def _read_document(
+        self,
+        file_path: Path,
+        entry: OCRCacheEntry
+    ) -> Optional[CachedDocument]:
+        """Le e decodifica o arquivo de cache de uma entrada valida."""
         cache_file = self.cache_dir / entry.cache_file
         
         try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                doc = CachedDocument.from_dict(data)
-                logger.info(f"Cache hit: {file_path.name} ({entry.num_pages} paginas)")
-                return doc
+            data = _decode_document(cache_file)
+            doc = CachedDocument.from_dict(data)
+            logger.info(f"Cache hit: {file_path.name} ({entry.num_pages} paginas)")
+            return doc
         except Exception as e:
             logger.warning(f"Erro ao ler cache: {e}")
             return None
@@ -218,7 +656,9 @@ class OCRCache:
         file_path: Path,
         pages: List[Dict[str, Any]],
         extraction_time: float,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        file_hash: Optional[str] = None,
+        total_words: Optional[int] = None
     ) -> None:
         """
         Salva documento no cache.
@@ -228,67 +668,75 @@ class OCRCache:
             pages: Lista de paginas [{"number": 1, "text": "..."}, ...]
             extraction_time: Tempo de extracao em segundos
             metadata: Metadados adicionais
+            file_hash: Hash do arquivo, se ja calculado
+            total_words: Total de palavras, se ja contado (ex.: pelo OCR)
         """
         if not self.enabled:
             return
         
-        file_hash = self.get_cache_key(file_path)
-        cache_filename = f"{file_hash[:16]}.json"
-        cache_file = self.cache_dir / cache_filename
+        file_hash = file_hash or self.get_cache_key(file_path)
         
-        # Calcula estatisticas
-        full_text = "\n\n".join(p.get("text", "") for p in pages)
-        total_words = len(full_text.split())
+        # Calcula estatisticas (por pagina, sem concatenar o texto todo)
+        if total_words is None:
+            total_words = sum(len(p.get("text", "").split()) for p in pages)
         
-        # Cria documento
-        doc = CachedDocument(
-            file_name=file_path.name,
-            file_hash=file_hash,
-            pages=pages,
-            full_text=full_text,
-            metadata=metadata or {}
-        )
+        # Documento gravado sem full_text (derivado de pages na leitura),
+        # o que reduz o arquivo a cerca de metade
+        doc_data = {
+            "file_name": file_path.name,
+            "file_hash": file_hash,
+            "pages": pages,
+            "metadata": metadata or {},
+        }
         
         # Salva documento
         try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(doc.to_dict(), f, ensure_ascii=False)
+            suffix, payload = _encode_document(doc_data)
+            cache_filename = f"{file_hash[:16]}{suffix}"
+            (self.cache_dir / cache_filename).write_bytes(payload)
         except Exception as e:
             logger.warning(f"Erro ao salvar cache: {e}")
             return
         
+        # Remove arquivo anterior gravado em outro formato
+        previous = self._index.get(file_hash)
+        if previous is not None and previous.cache_file != cache_filename:
+            (self.cache_dir / previous.cache_file).unlink(missing_ok=True)
+        
         # Atualiza indice
+        file_size = file_path.stat().st_size
         entry = OCRCacheEntry(
             file_name=file_path.name,
             file_hash=file_hash,
-            file_size=file_path.stat().st_size,
+            file_size=file_size,
             num_pages=len(pages),
             total_words=total_words,
             extracted_at=datetime.now().isoformat(),
             extraction_time_seconds=extraction_time,
             cache_file=cache_filename,
-            metadata=metadata or {}
+            metadata={**(metadata or {}), "hash_scheme": hash_scheme(file_size)}
         )
         
         self._index[file_hash] = entry
-        self._save_index()
+        self._store_entry(entry)
         
         logger.info(
             f"Cache salvo: {file_path.name} "
             f"({len(pages)} paginas, {total_words} palavras)"
         )
     
-    def remove(self, file_path: Path) -> bool:
+    def remove(self, file_path: Path, file_hash: Optional[str] = None) -> bool:
         """
         Remove entrada do cache.
         
         Args:
             file_path: Caminho do PDF
+            file_hash: Hash do arquivo, se ja calculado
         
         Returns:
             True se removido com sucesso
         """
-        file_hash = self.get_cache_key(file_path)
+        file_hash = file_hash or self.get_cache_key(file_path)
         
         if file_hash not in self._index:
             return False
@@ -302,7 +750,7 @@ class OCRCache:
         
         # Remove do indice
         del self._index[file_hash]
-        self._save_index()
+        self._delete_entries([file_hash])
         
         logger.info(f"Cache removido: {file_path.name}")
         return True
@@ -330,7 +778,7 @@ class OCRCache:
             del self._index[file_hash]
         
         if to_remove:
-            self._save_index()
+            self._delete_entries([file_hash for file_hash, _ in to_remove])
         
         return len(to_remove)
     
@@ -350,8 +798,9 @@ class OCRCache:
                 cache_file.unlink()
         
         # Limpa indice
+        file_hashes = list(self._index)
         self._index.clear()
-        self._save_index()
+        self._delete_entries(file_hashes)
         
         logger.info(f"Cache limpo: {count} entradas removidas")
         return count
@@ -363,11 +812,13 @@ class OCRCache:
         Returns:
             Numero de entradas removidas
         """
-        to_remove = []
-        
-        for file_hash, entry in self._index.items():
-            if entry.age_hours > self.max_age_hours:
-                to_remove.append((file_hash, entry))
+        # extracted_at e ISO 8601 de largura fixa: comparar as strings com o
+        # limite equivale a comparar as datas, sem fromisoformat por entrada
+        cutoff = (datetime.now() - timedelta(hours=self.max_age_hours)).isoformat()
+        to_remove = [
+            (file_hash, entry) for file_hash, entry in self._index.items()
+            if entry.extracted_at < cutoff
+        ]
         
         for file_hash, entry in to_remove:
             cache_file = self.cache_dir / entry.cache_file
@@ -376,7 +827,7 @@ class OCRCache:
             del self._index[file_hash]
         
         if to_remove:
-            self._save_index()
+            self._delete_entries([file_hash for file_hash, _ in to_remove])
             logger.info(f"Limpeza: {len(to_remove)} entradas expiradas removidas")
         
         return len(to_remove)
@@ -388,9 +839,9 @@ class OCRCache:
         Returns:
             Lista de entradas ordenadas por data
         """
-        entries = list(self._index.values())
-        entries.sort(key=lambda e: e.extracted_at, reverse=True)
-        return entries
+        return sorted(
+            self._index.values(), key=attrgetter("extracted_at"), reverse=True
+        )
     
     def get_entry_info(self, file_name: str) -> Optional[OCRCacheEntry]:
         """
@@ -427,17 +878,22 @@ class OCRCache:
                 "cache_dir": str(self.cache_dir),
             }
         
-        total_pages = sum(e.num_pages for e in entries)
-        total_words = sum(e.total_words for e in entries)
-        total_size = sum(e.file_size for e in entries)
-        total_time = sum(e.extraction_time_seconds for e in entries)
+        total_pages = sum(map(attrgetter("num_pages"), entries))
+        total_words = sum(map(attrgetter("total_words"), entries))
+        total_size = sum(map(attrgetter("file_size"), entries))
+        total_time = sum(map(attrgetter("extraction_time_seconds"), entries))
         
-        # Calcula tamanho do cache em disco
+        # Calcula tamanho do cache em disco: uma listagem do diretorio em vez
+        # de exists()+stat() por entrada (no Windows o tamanho ja vem nela)
+        cache_files = set(map(attrgetter("cache_file"), entries))
         cache_size = 0
-        for entry in entries:
-            cache_file = self.cache_dir / entry.cache_file
-            if cache_file.exists():
-                cache_size += cache_file.stat().st_size
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for item in it:
+                    if item.name in cache_files:
+                        cache_size += item.stat().st_size
+        except OSError as e:
+            logger.warning(f"Erro ao medir o cache em disco: {e}")
         
         return {
             "enabled": self.enabled,
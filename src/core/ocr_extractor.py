@@ -5,8 +5,11 @@ from __future__ import annotations
 import logging
 import os
 import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Deque, List, Optional, Tuple
 
 import cv2
 import numpy as np
@@ -19,6 +22,10 @@ from models.extraction_result import ExtractionResult
 
 logger = logging.getLogger(__name__)
 
+# Páginas em andamento por processo do OCR em paralelo (limita a memória
+# compartilhada ocupada ao mesmo tempo)
+OCR_PAGES_PER_WORKER = 2
+
 
 class OCRExtractor:
     """Extrator de texto usando Tesseract OCR."""
@@ -62,15 +69,18 @@ class OCRExtractor:
         logger.info(f"Iniciando extração OCR de {document.total_pages} páginas")
         
         try:
+            pages = []
             for page in document.pages:
                 if page.image is None:
                     result.add_warning(f"Página {page.number} sem imagem")
-                    continue
-                
-                text, confidence = self._extract_from_page(page)
+                else:
+                    pages.append(page)
+            
+            outputs = zip(pages, self._extract_pages(pages))
+            for page, (text, confidence, word_count) in outputs:
                 page.text = text
                 page.confidence = confidence
-                page.word_count = len(text.split()) if text else 0
+                page.word_count = word_count
                 
                 logger.debug(
                     f"Página {page.number}: {page.word_count} palavras, "
@@ -90,7 +100,7 @@ class OCRExtractor:
         
         return result
     
-    def _extract_from_page(self, page: Page) -> Tuple[str, float]:
+    def _extract_from_page(self, page: Page) -> Tuple[str, float, int]:
         """
         Extrai texto de uma única página.
         
@@ -98,46 +108,106 @@ class OCRExtractor:
             page: Página com imagem.
         
         Returns:
-            Tuple[str, float]: Texto extraído e confiança.
+            Tuple[str, float, int]: Texto extraído, confiança e palavras.
         """
         if page.image is None:
-            return "", 0.0
+            return "", 0.0, 0
         
         # Pré-processa a imagem para melhorar OCR
         processed_image = self._preprocess_image(page.image.image)
         
-        # Configuração do Tesseract
-        config = self.settings.ocr.config
-        lang = self.settings.ocr.language
-        
         try:
-            # Extrai texto
-            text = pytesseract.image_to_string(
-                processed_image,
-                lang=lang,
-                config=config
-            )
-            
-            # Obtém dados detalhados para calcular confiança
-            data = pytesseract.image_to_data(
+            return _ocr_image(
                 processed_image,
-                lang=lang,
-                config=config,
-                output_type=pytesseract.Output.DICT
+                self.settings.ocr.language,
+                self.settings.ocr.config,
+                binary=not self.settings.ocr.aggressive_denoise
             )
-            
-            # Calcula confiança média
-            confidences = [
-                int(c) for c in data["conf"] 
-                if c != "-1" and str(c).isdigit()
-            ]
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
-            
-            return text.strip(), avg_confidence / 100.0
-            
         except Exception as e:
             logger.error(f"Erro no OCR da página {page.number}: {e}")
-            return "", 0.0
+            return "", 0.0, 0
+    
+    def _extract_pages(self, pages: List[Page]) -> List[Tuple[str, float, int]]:
+        """
+        Extrai o texto de várias páginas, em paralelo quando possível.
+        
+        O Tesseract usa um único núcleo por chamada, então as páginas são
+        distribuídas em um pool de processos (uma página por tarefa, na
+        ordem original). Com uma página ou um núcleo, roda em sequência.
+        
+        Args:
+            pages: Páginas com imagem.
+        
+        Returns:
+            List[Tuple[str, float, int]]: Texto, confiança e palavras de
+            cada página.
+        """
+        workers = min(os.cpu_count() or 1, len(pages))
+        if workers < 2:
+            return [self._extract_from_page(page) for page in pages]
+        
+        # No máximo 2 páginas por processo em memória compartilhada: cada
+        # bloco é liberado assim que a página termina
+        window = min(OCR_PAGES_PER_WORKER * workers, len(pages))
+        largest = max(_page_gray_nbytes(page.image.image) for page in pages)
+        if not _shared_memory_fits(window * largest):
+            logger.warning(
+                "Memória compartilhada insuficiente para o OCR em paralelo; "
+                "processando as páginas em sequência"
+            )
+            return [self._extract_from_page(page) for page in pages]
+        
+        ocr = self.settings.ocr
+        results: List[Tuple[str, float, int]] = []
+        pending: Deque[Tuple[Page, Future, SharedMemory]] = deque()
+        serial_from = len(pages)
+        
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_ocr_worker
+            ) as executor:
+                for index, page in enumerate(pages):
+                    if len(pending) >= window:
+                        results.append(_collect_page(*pending.popleft()))
+                    
+                    # Vai a imagem em escala de cinza (um terço do RGB);
+                    # cada tarefa leva só (nome, shape, dtype) do bloco
+                    gray = _page_gray(page.image.image)
+                    try:
+                        shm = _share_image(gray)
+                    except OSError as e:
+                        logger.warning(
+                            f"Memória compartilhada indisponível ({e}); "
+                            "OCR das demais páginas em sequência"
+                        )
+                        serial_from = index
+                        break
+                    
+                    try:
+                        future = executor.submit(
+                            _ocr_page_worker,
+                            shm.name,
+                            gray.shape,
+                            gray.dtype.str,
+                            ocr.language,
+                            ocr.config,
+                            pytesseract.pytesseract.tesseract_cmd,
+                            ocr.aggressive_denoise,
+                        )
+                    except BaseException:
+                        _release_shared(shm)
+                        raise
+                    pending.append((page, future, shm))
+                
+                while pending:
+                    results.append(_collect_page(*pending.popleft()))
+        finally:
+            for _, _, shm in pending:
+                _release_shared(shm)
+        
+        results.extend(self._extract_from_page(page) for page in pages[serial_from:])
+        return results
     
     def _preprocess_image(self, image: np.ndarray) -> np.ndarray:
         """
@@ -149,26 +219,7 @@ class OCRExtractor:
         Returns:
             np.ndarray: Imagem pré-processada.
         """
-        # Converte para escala de cinza se necessário
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = image.copy()
-        
-        # Aplica threshold adaptativo para melhorar contraste
-        binary = cv2.adaptiveThreshold(
-            gray,
-            255,
-            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY,
-            11,
-            2
-        )
-        
-        # Remove ruído
-        denoised = cv2.fastNlMeansDenoising(binary, None, 10, 7, 21)
-        
-        return denoised
+        return _preprocess_page_image(image, self.settings.ocr.aggressive_denoise)
     
     def extract_with_boxes(self, page: Page) -> dict:
         """
@@ -212,3 +263,235 @@ class OCRExtractor:
         except Exception as e:
             logger.error(f"Erro ao obter idiomas: {e}")
             return []
+
+
+def _preprocess_page_image(image: np.ndarray, aggressive_denoise: bool) -> np.ndarray:
+    """
+    Pré-processa a imagem de uma página para o OCR.
+    
+    Função de módulo (e não método) para poder rodar nos processos do pool.
+    """
+    # Converte para escala de cinza se necessário
+    if len(image.shape) == 3:
+        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    else:
+        gray = image.copy()
+    
+    # Aplica threshold adaptativo para melhorar contraste
+    binary = cv2.adaptiveThreshold(
+        gray,
+        255,
+        cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+        cv2.THRESH_BINARY,
+        11,
+        2
+    )
+    
+    # Remove ruído: na imagem binarizada um filtro de mediana 3x3 basta;
+    # o non-local means (muito mais lento) fica para scans ruins
+    if aggressive_denoise:
+        return cv2.fastNlMeansDenoising(binary, None, 10, 7, 21)
+    
+    return cv2.medianBlur(binary, 3)
+
+
+def _ocr_image(
+    image: np.ndarray,
+    lang: str,
+    config: str,
+    binary: bool = False
+) -> Tuple[str, float, int]:
+    """
+    Roda o Tesseract e retorna o texto, a confiança média (0-1) e o
+    número de palavras.
+    
+    Uma única chamada (image_to_data) traz as palavras e as confianças;
+    o texto é remontado a partir delas, sem rodar o OCR duas vezes, e as
+    palavras são contadas nessa mesma passada (sem text.split()).
+    """
+    data = pytesseract.image_to_data(
+        _to_tesseract_image(image, binary),
+        lang=lang,
+        config=config,
+        output_type=pytesseract.Output.DICT
+    )
+    
+    text, word_count = _text_from_data(data)
+    
+    # Calcula confiança média (-1 marca linhas de estrutura, sem palavra).
+    # float aceita tanto ints quanto os decimais do Tesseract 5 ("96.5")
+    confidences = np.asarray(data["conf"], dtype=np.float32)
+    confidences = confidences[confidences >= 0]
+    avg_confidence = float(confidences.mean()) if confidences.size else 0.0
+    
+    return text, avg_confidence / 100.0, word_count
+
+
+def _to_tesseract_image(image: np.ndarray, binary: bool) -> Image.Image:
+    """
+    Converte a página pré-processada para a imagem entregue ao Tesseract.
+    
+    O pytesseract grava a imagem em um PNG temporário a cada chamada;
+    uma página binarizada vai em 1 bit por pixel, o que deixa o arquivo
+    bem menor e mais rápido de codificar do que em escala de cinza.
+    """
+    pil_image = Image.fromarray(image)
+    if binary:
+        return pil_image.convert("1", dither=Image.Dither.NONE)
+    return pil_image
+
+
+def _text_from_data(data: dict) -> Tuple[str, int]:
+    """
+    Remonta o texto da página a partir da saída de image_to_data.
+    
+    Palavras da mesma linha são unidas por espaço, linhas por quebra de
+    linha e parágrafos/blocos por uma linha em branco, como no
+    image_to_string.
+    
+    Returns:
+        Tuple[str, int]: Texto e número de palavras.
+    """
+    lines: List[str] = []
+    words: List[str] = []
+    word_count = 0
+    current_line = None
+    current_par = None
+    
+    for block, par, line, word in zip(
+        data["block_num"], data["par_num"], data["line_num"], data["text"]
+    ):
+        word = word.strip() if word else ""
+        if not word:
+            continue
+        
+        if (block, par, line) != current_line:
+            if words:
+                lines.append(" ".join(words))
+                words = []
+            if current_par is not None and (block, par) != current_par:
+                lines.append("")
+            current_line = (block, par, line)
+            current_par = (block, par)
+        
+        words.append(word)
+        word_count += 1
+    
+    if words:
+        lines.append(" ".join(words))
+    
+    return "\n".join(lines), word_count
+
+
+def _page_gray(image: np.ndarray) -> np.ndarray:
+    """Página em escala de cinza (o primeiro passo do pré-processamento)."""
+    if image.ndim == 3:
+        return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    return image
+
+
+def _page_gray_nbytes(image: np.ndarray) -> int:
+    """Tamanho em bytes da página em escala de cinza."""
+    return image.shape[0] * image.shape[1] * image.itemsize
+
+
+def _shared_memory_fits(nbytes: int) -> bool:
+    """
+    Verifica se há espaço livre para nbytes em memória compartilhada.
+    
+    No Linux os blocos ficam em /dev/shm (tmpfs, 64 MB por padrão no
+    Docker), reservado só na escrita: passar do limite derruba o processo
+    com SIGBUS em vez de gerar uma exceção.
+    """
+    try:
+        stat = os.statvfs("/dev/shm")
+    except (AttributeError, OSError):
+        # Windows/macOS: a memória compartilhada não vem de um tmpfs
+        return True
+    return stat.f_bavail * stat.f_frsize >= nbytes
+
+
+def _share_image(image: np.ndarray) -> SharedMemory:
+    """Copia a imagem para um bloco de memória compartilhada novo."""
+    shm = SharedMemory(create=True, size=max(image.nbytes, 1))
+    try:
+        np.ndarray(image.shape, dtype=image.dtype, buffer=shm.buf)[:] = image
+    except BaseException:
+        _release_shared(shm)
+        raise
+    return shm
+
+
+def _release_shared(shm: SharedMemory) -> None:
+    """Fecha e remove um bloco de memória compartilhada."""
+    shm.close()
+    shm.unlink()
+
+
+def _collect_page(
+    page: Page,
+    future: Future,
+    shm: SharedMemory
+) -> Tuple[str, float, int]:
+    """
+    Aguarda o OCR de uma página do pool e libera o bloco da imagem.
+    
+    Returns:
+        Tuple[str, float, int]: Texto, confiança e palavras.
+    """
+    try:
+        text, confidence, word_count, error = future.result()
+    finally:
+        _release_shared(shm)
+    
+    if error:
+        logger.error(f"Erro no OCR da página {page.number}: {error}")
+    return text, confidence, word_count
+
+
+def _init_ocr_worker() -> None:
+    """Limita o Tesseract a uma thread OpenMP em cada processo do pool."""
+    # Os processos já ocupam os núcleos; o paralelismo interno do
+    # Tesseract apenas disputaria as mesmas CPUs
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _ocr_page_worker(
+    shm_name: str,
+    shape: Tuple[int, ...],
+    dtype: str,
+    lang: str,
+    config: str,
+    tesseract_cmd: str,
+    aggressive_denoise: bool
+) -> Tuple[str, float, int, Optional[str]]:
+    """
+    OCR de uma página em um processo do pool.
+    
+    A imagem (em escala de cinza) é lida sem cópia do bloco de memória
+    compartilhada criado pelo processo principal (que é quem o libera). Erros são devolvidos
+    como texto (o logging do processo filho não é configurado), para o
+    processo principal registrar.
+    
+    Returns:
+        Tuple[str, float, int, Optional[str]]: Texto, confiança, palavras
+        e erro.
+    """
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    try:
+        shm = SharedMemory(name=shm_name)
+        image = None
+        try:
+            image = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+            processed = _preprocess_page_image(image, aggressive_denoise)
+        finally:
+            # Nenhuma view pode sobrar apontando para o buffer ao fechar
+            image = None
+            shm.close()
+        
+        text, confidence, word_count = _ocr_image(
+            processed, lang, config, binary=not aggressive_denoise
+        )
+        return text, confidence, word_count, None
+    except Exception as e:
+        return "", 0.0, 0, str(e)
@@ -4,19 +4,35 @@ from __future__ import annotations
 
 import json
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 import cv2
 import numpy as np
 
+try:
+    import orjson
+except ImportError:  # orjson é opcional; usa json da stdlib
+    orjson = None
+
 from config.settings import Settings, get_settings
 from models.document import Document, Page
 from models.search_result import SearchResult, SearchMatch
 
 logger = logging.getLogger(__name__)
 
+# Tamanho máximo do trecho de cada match no relatório JSON
+REPORT_PREVIEW_CHARS = 100
+
+
+def _preview(text: str, limit: int = REPORT_PREVIEW_CHARS) -> str:
+    """Trecho do texto para o relatório (cortado com "..." se passar do limite)."""
+    return text if len(text) <= limit else text[:limit] + "..."
+
 
 class OutputGenerator:
     """
@@ -64,6 +80,9 @@ class OutputGenerator:
         
         generated_files = {}
         
+        # Matches agrupados por página uma única vez para imagens e relatório
+        page_index = search_result.matches_by_page()
+        
         # 1. Arquivo com textos encontrados
         found_texts_path = output_dir / f"{base_name}_{timestamp}_found_texts.txt"
         self.generate_found_texts(search_result, found_texts_path)
@@ -73,13 +92,13 @@ class OutputGenerator:
         if search_result.found_any:
             highlighted_dir = output_dir / f"{base_name}_{timestamp}_highlighted"
             highlighted_paths = self.generate_highlighted_images(
-                document, search_result, highlighted_dir
+                document, search_result, highlighted_dir, page_index
             )
             generated_files["highlighted_images"] = highlighted_paths
         
         # 3. Relatório de páginas
         report_path = output_dir / f"{base_name}_{timestamp}_report.json"
-        self.generate_page_report(document, search_result, report_path)
+        self.generate_page_report(document, search_result, report_path, page_index)
         generated_files["report"] = str(report_path)
         
         logger.info(f"Arquivos gerados em: {output_dir}")
@@ -100,33 +119,44 @@ class OutputGenerator:
         """
         output_path = Path(output_path)
         
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write("=" * 60 + "\n")
-            f.write("TEXTOS ENCONTRADOS NO DOCUMENTO\n")
-            f.write(f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
-            f.write("=" * 60 + "\n\n")
+        # Monta o conteúdo todo em memória e grava de uma vez
+        separator = "-" * 60 + "\n"
+        parts = [
+            "=" * 60 + "\n"
+            "TEXTOS ENCONTRADOS NO DOCUMENTO\n"
+            f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n"
+            + "=" * 60 + "\n\n"
+        ]
+        
+        if not search_result.found_any:
+            parts.append("Nenhum texto encontrado para as instruções fornecidas.\n")
+            output_path.write_text("".join(parts), encoding="utf-8")
+            return
+        
+        for instr_match in search_result.instruction_matches:
+            parts.append(
+                f"{separator}"
+                f"INSTRUÇÃO {instr_match.instruction_index + 1}:\n"
+                f"{instr_match.instruction}\n"
+                f"{separator}\n"
+            )
             
-            if not search_result.found_any:
-                f.write("Nenhum texto encontrado para as instruções fornecidas.\n")
-                return
+            if not instr_match.found:
+                parts.append("  [Não encontrado]\n\n")
+                continue
             
-            for instr_match in search_result.instruction_matches:
-                f.write("-" * 60 + "\n")
-                f.write(f"INSTRUÇÃO {instr_match.instruction_index + 1}:\n")
-                f.write(f"{instr_match.instruction}\n")
-                f.write("-" * 60 + "\n\n")
-                
-                if not instr_match.found:
-                    f.write("  [Não encontrado]\n\n")
-                    continue
-                
-                for i, match in enumerate(instr_match.matches, 1):
-                    f.write(f"  Match {i} (Score: {match.score:.2f}):\n")
-                    f.write(f"  Página: {match.position.page}\n")
-                    f.write(f"  Texto: {match.text}\n")
-                    if match.context_before or match.context_after:
-                        f.write(f"  Contexto: ...{match.context_before} [{match.text}] {match.context_after}...\n")
-                    f.write("\n")
+            for i, match in enumerate(instr_match.matches, 1):
+                context = ""
+                if match.context_before or match.context_after:
+                    context = f"  Contexto: ...{match.context_before} [{match.text}] {match.context_after}...\n"
+                parts.append(
+                    f"  Match {i} (Score: {match.score:.2f}):\n"
+                    f"  Página: {match.position.page}\n"
+                    f"  Texto: {match.text}\n"
+                    f"{context}\n"
+                )
+        
+        output_path.write_text("".join(parts), encoding="utf-8")
         
         logger.info(f"Arquivo de textos encontrados: {output_path}")
     
@@ -134,7 +164,8 @@ class OutputGenerator:
         self,
         document: Document,
         search_result: SearchResult,
-        output_dir: Path
+        output_dir: Path,
+        page_index: Optional[Dict[int, List[SearchMatch]]] = None
     ) -> List[str]:
         """
         Gera imagens com texto destacado usando OpenCV.
@@ -143,6 +174,8 @@ class OutputGenerator:
             document: Documento com imagens das páginas.
             search_result: Resultados da busca.
             output_dir: Diretório de saída.
+            page_index: Matches por página (search_result.matches_by_page()),
+                se já calculado.
         
         Returns:
             List[str]: Caminhos das imagens geradas.
@@ -150,46 +183,137 @@ class OutputGenerator:
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        generated_paths = []
-        pages_with_matches = search_result.all_pages
+        if page_index is None:
+            page_index = search_result.matches_by_page()
+        pages_with_matches = sorted(page_index.items())
         
-        for page_num in pages_with_matches:
-            page = document.get_page(page_num)
-            
-            if page is None or page.image is None:
-                logger.warning(f"Página {page_num} sem imagem disponível")
-                continue
-            
-            # Obtém matches desta página
-            page_matches = search_result.get_matches_by_page(page_num)
-            
-            if not page_matches:
-                continue
-            
-            # Cria imagem destacada
-            highlighted_image = self._highlight_text_in_image(
-                page.image.image.copy(),
-                page.text,
-                page_matches
-            )
+        # As páginas são codificadas em memória e gravadas por uma única
+        # thread de escrita: a gravação de uma página fica sobreposta à
+        # codificação da próxima
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            pending = []
             
-            # Salva imagem
-            output_format = self.settings.output.output_format
-            output_path = output_dir / f"page_{page_num:03d}.{output_format}"
+            def write(path: Path, data: np.ndarray) -> None:
+                pending.append(writer.submit(path.write_bytes, data))
             
-            # Converte RGB para BGR para OpenCV salvar corretamente
-            if len(highlighted_image.shape) == 3:
-                highlighted_image = cv2.cvtColor(highlighted_image, cv2.COLOR_RGB2BGR)
+            render = partial(self._render_page, document, output_dir, write=write)
             
-            cv2.imwrite(str(output_path), highlighted_image)
-            generated_paths.append(str(output_path))
+            # Cada página é independente e o trabalho pesado (NumPy/OpenCV e
+            # a codificação da imagem) libera o GIL: renderiza em threads
+            workers = min(len(pages_with_matches), os.cpu_count() or 1)
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    rendered = list(executor.map(render, *zip(*pages_with_matches)))
+            else:
+                rendered = [
+                    render(page_num, page_matches)
+                    for page_num, page_matches in pages_with_matches
+                ]
             
-            logger.debug(f"Imagem destacada gerada: {output_path}")
+            # Propaga erros de gravação
+            for future in pending:
+                future.result()
+        
+        generated_paths = [path for path in rendered if path]
         
         logger.info(f"Geradas {len(generated_paths)} imagens destacadas")
         
         return generated_paths
     
+    def _render_page(
+        self,
+        document: Document,
+        output_dir: Path,
+        page_num: int,
+        page_matches: List[SearchMatch],
+        write: Optional[Callable[[Path, np.ndarray], None]] = None
+    ) -> Optional[str]:
+        """
+        Gera a imagem destacada de uma página.
+        
+        Args:
+            document: Documento com imagens das páginas.
+            output_dir: Diretório de saída.
+            page_num: Número da página.
+            page_matches: Matches desta página.
+            write: Grava os bytes codificados (padrão: na hora).
+        
+        Returns:
+            Optional[str]: Caminho da imagem gerada ou None.
+        """
+        page = document.get_page(page_num)
+        
+        if page is None or page.image is None:
+            logger.warning(f"Página {page_num} sem imagem disponível")
+            return None
+        
+        if not page_matches:
+            return None
+        
+        output_format = self.settings.output.output_format
+        output_path = output_dir / f"page_{page_num:03d}.{output_format}"
+        
+        image = page.image.image
+        regions = self._highlight_regions(image, page.text, page_matches)
+        
+        if image.ndim == 3:
+            # O OpenCV grava em BGR e a conversão já cria uma cópia da
+            # página: o destaque é aplicado nela (com a cor em BGR), sem
+            # outra passada pela imagem e sem tocar na original
+            bgr_image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+            self._blend_regions(bgr_image, regions, bgr=True)
+            self._imwrite(output_path, bgr_image, write)
+        else:
+            if not image.flags.writeable:
+                image = image.copy()
+            
+            # Escala de cinza: destaca direto na imagem da página e devolve
+            # os pixels originais depois de codificar (copia só as faixas)
+            originals = [image[region].copy() for region in regions]
+            try:
+                self._blend_regions(image, regions)
+                self._imwrite(output_path, image, write)
+            finally:
+                for region, pixels in zip(regions, originals):
+                    image[region] = pixels
+        
+        logger.debug(f"Imagem destacada gerada: {output_path}")
+        
+        return str(output_path)
+    
+    def _imwrite(
+        self,
+        output_path: Path,
+        image: np.ndarray,
+        write: Optional[Callable[[Path, np.ndarray], None]] = None
+    ) -> None:
+        """
+        Codifica com cv2.imencode uma imagem já em BGR (ou escala de cinza)
+        e grava os bytes.
+        
+        Args:
+            output_path: Caminho do arquivo.
+            image: Imagem BGR (ou escala de cinza).
+            write: Grava os bytes codificados (padrão: na hora).
+        """
+        params = []
+        if self.settings.output.output_format.lower() in ("jpg", "jpeg"):
+            params = [
+                cv2.IMWRITE_JPEG_QUALITY, self.settings.output.jpeg_quality,
+                cv2.IMWRITE_JPEG_OPTIMIZE, 0,
+                cv2.IMWRITE_JPEG_PROGRESSIVE, 0,
+            ]
+        
+        success, encoded = cv2.imencode(output_path.suffix, image, params)
+        if not success:
+            logger.error(f"Falha ao codificar imagem: {output_path}")
+            return
+        
+        if write is None:
+            output_path.write_bytes(encoded)
+        else:
+            write(output_path, encoded)
+    
     def _highlight_text_in_image(
         self,
         image: np.ndarray,
@@ -199,7 +323,8 @@ class OutputGenerator:
         """
         Destaca texto encontrado na imagem da página.
         
-        Usa técnica de overlay com cor de destaque.
+        Aplica a cor de destaque com alpha blending apenas nas faixas
+        destacadas, direto na imagem recebida (que é alterada).
         
         Args:
             image: Imagem da página.
@@ -209,9 +334,27 @@ class OutputGenerator:
         Returns:
             np.ndarray: Imagem com destaques.
         """
-        # Cria overlay para os destaques
-        overlay = image.copy()
+        self._blend_regions(image, self._highlight_regions(image, page_text, matches))
+        return image
+    
+    def _highlight_regions(
+        self,
+        image: np.ndarray,
+        page_text: str,
+        matches: List[SearchMatch]
+    ) -> List[Tuple[slice, slice]]:
+        """
+        Calcula as faixas da imagem a destacar para os matches.
         
+        Args:
+            image: Imagem da página.
+            page_text: Texto completo da página.
+            matches: Lista de matches para destacar.
+        
+        Returns:
+            List[Tuple[slice, slice]]: Regiões (linhas, colunas) sem
+            sobreposição.
+        """
         # Estimativa de posição baseada em proporção do texto
         # (aproximação quando não temos coordenadas exatas do OCR)
         text_length = len(page_text) if page_text else 1
@@ -223,10 +366,13 @@ class OutputGenerator:
         text_width = width - 2 * margin_x
         text_height = height - 2 * margin_y
         
+        strips = []
+        add_strip = strips.append
         for match in matches:
             # Calcula posição aproximada baseada na posição do caractere
-            char_start = match.position.start_char
-            char_end = match.position.end_char
+            position = match.position
+            char_start = position.start_char
+            char_end = position.end_char
             
             # Proporção no texto
             start_ratio = char_start / text_length
@@ -240,29 +386,60 @@ class OutputGenerator:
             if y_end - y_start < 20:
                 y_end = y_start + 20
             
-            # Desenha retângulo de destaque
-            pt1 = (margin_x, max(0, y_start - 5))
-            pt2 = (width - margin_x, min(height, y_end + 5))
-            
-            cv2.rectangle(
-                overlay,
-                pt1,
-                pt2,
-                self.highlight_color,
-                -1  # Preenchido
-            )
+            # Faixa de destaque (limites inclusivos, como no cv2.rectangle)
+            add_strip((max(0, y_start - 5), min(height, y_end + 5)))
+        
+        # Todas as faixas ocupam a mesma largura: junta as que se sobrepõem
+        # para cada pixel ser mesclado uma única vez
+        merged: List[List[int]] = []
+        for y0, y1 in sorted(strips):
+            if merged and y0 <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], y1)
+            else:
+                merged.append([y0, y1])
+        
+        return [
+            (slice(y0, y1 + 1), slice(margin_x, width - margin_x + 1))
+            for y0, y1 in merged
+        ]
+    
+    def _blend_regions(
+        self,
+        image: np.ndarray,
+        regions: List[Tuple[slice, slice]],
+        bgr: bool = False
+    ) -> None:
+        """
+        Mescla a cor de destaque nas regiões, alterando a imagem.
         
-        # Combina overlay com imagem original usando alpha blending
-        alpha = self.highlight_opacity
-        result = cv2.addWeighted(overlay, alpha, image, 1 - alpha, 0)
+        Args:
+            image: Imagem da página.
+            regions: Regiões retornadas por _highlight_regions.
+            bgr: Se a imagem está em BGR (a cor configurada é RGB).
+        """
+        color = tuple(self.highlight_color)
+        if bgr:
+            color = color[2::-1] + color[3:]
+        
+        # Cor no número de canais da imagem (canais faltantes = 0, como no cv2)
+        channels = 1 if image.ndim == 2 else image.shape[2]
+        color = (color + (0,) * 4)[:channels]
         
-        return result
+        # Mescla a cor só nas faixas destacadas, em vez de copiar e mesclar
+        # a página inteira
+        alpha = self.highlight_opacity
+        for region in regions:
+            roi = image[region]
+            fill = np.empty_like(roi)
+            fill[...] = color if channels > 1 else color[0]
+            roi[...] = cv2.addWeighted(fill, alpha, roi, 1 - alpha, 0)
     
     def generate_page_report(
         self,
         document: Document,
         search_result: SearchResult,
-        output_path: Path
+        output_path: Path,
+        page_index: Optional[Dict[int, List[SearchMatch]]] = None
     ) -> None:
         """
         Gera relatório JSON com informações das páginas.
@@ -271,9 +448,14 @@ class OutputGenerator:
             document: Documento processado.
             search_result: Resultados da busca.
             output_path: Caminho do arquivo de saída.
+            page_index: Matches por página (search_result.matches_by_page()),
+                se já calculado.
         """
         output_path = Path(output_path)
         
+        if page_index is None:
+            page_index = search_result.matches_by_page()
+        
         report = {
             "documento": {
                 "arquivo": str(document.source_path),
@@ -293,16 +475,15 @@ class OutputGenerator:
         }
         
         # Páginas com matches
-        report["paginas_com_matches"] = search_result.all_pages
+        report["paginas_com_matches"] = sorted(page_index)
         
         # Detalhes por página
-        for page_num in search_result.all_pages:
-            page_matches = search_result.get_matches_by_page(page_num)
-            report["detalhes_por_pagina"][str(page_num)] = {
+        for page_num, page_matches in sorted(page_index.items()):
+            report["detalhes_por_pagina"][page_num] = {
                 "quantidade_matches": len(page_matches),
                 "matches": [
                     {
-                        "texto": m.text[:100] + "..." if len(m.text) > 100 else m.text,
+                        "texto": _preview(m.text),
                         "score": round(m.score, 2),
                         "tipo": m.match_type,
                         "posicao_char": m.position.start_char
@@ -321,9 +502,14 @@ class OutputGenerator:
                 "paginas": instr_match.pages_found
             })
         
-        # Salva JSON
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(report, f, ensure_ascii=False, indent=2)
+        # Salva JSON (chaves int das páginas viram texto nos dois caminhos)
+        if orjson is not None:
+            output_path.write_bytes(
+                orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            )
+        else:
+            with open(output_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
         
         logger.info(f"Relatório gerado: {output_path}")
     
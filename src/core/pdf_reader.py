@@ -10,8 +10,11 @@ Esta implementação usa PyMuPDF que:
 from __future__ import annotations
 
 import logging
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Generator
+from typing import IO, Deque, Dict, List, Optional, Generator, Tuple
 
 import numpy as np
 import fitz  # PyMuPDF
@@ -22,6 +25,14 @@ from models.document import Document, Page, PageImage
 
 logger = logging.getLogger(__name__)
 
+# A partir de quantas páginas a renderização usa um pool de processos
+# (abaixo disso o custo de iniciar os processos não compensa)
+PARALLEL_RENDER_MIN_PAGES = 8
+
+# Páginas em andamento por processo na renderização em paralelo (limita as
+# imagens prontas esperando para serem consumidas)
+RENDER_PAGES_PER_WORKER = 2
+
 
 class PDFReader:
     """Leitor de arquivos PDF com suporte a imagens e texto usando PyMuPDF."""
@@ -37,6 +48,8 @@ class PDFReader:
         self.dpi = self.settings.ocr.dpi
         # Fator de zoom para PyMuPDF (DPI / 72, pois 72 é o DPI padrão do PDF)
         self.zoom = self.dpi / 72.0
+        # Número de páginas por (caminho, mtime): evita reabrir o PDF
+        self._count_cache: Dict[Tuple[Path, float], int] = {}
     
     def read(self, pdf_path: Path) -> Document:
         """
@@ -65,24 +78,37 @@ class PDFReader:
         # Cria documento
         document = Document(source_path=pdf_path)
         
-        # Extrai metadados
-        document.metadata = self._extract_metadata(pdf_path)
-        
-        # Converte páginas para imagens
-        pages = list(self._convert_to_images(pdf_path))
+        # Abre o PDF uma única vez para metadados e páginas
+        try:
+            doc = fitz.open(pdf_path)
+        except Exception as e:
+            logger.error(f"Erro ao abrir PDF: {e}")
+            raise
         
-        for page in pages:
-            document.add_page(page)
+        try:
+            # Extrai metadados
+            document.metadata = self._extract_metadata(doc, pdf_path)
+            if "page_count" in document.metadata:
+                self._count_cache[self._count_key(pdf_path)] = (
+                    document.metadata["page_count"]
+                )
+            
+            # Converte páginas para imagens (adicionadas conforme ficam prontas)
+            for page in self._convert_to_images(doc):
+                document.add_page(page)
+        finally:
+            doc.close()
         
         logger.info(f"PDF lido com sucesso: {document.total_pages} páginas")
         
         return document
     
-    def _extract_metadata(self, pdf_path: Path) -> dict:
+    def _extract_metadata(self, doc: "fitz.Document", pdf_path: Path) -> dict:
         """
         Extrai metadados do PDF usando PyMuPDF.
         
         Args:
+            doc: Documento PyMuPDF já aberto.
             pdf_path: Caminho para o arquivo PDF.
         
         Returns:
@@ -94,7 +120,6 @@ class PDFReader:
         }
         
         try:
-            doc = fitz.open(pdf_path)
             metadata["page_count"] = len(doc)
             
             # Extrai metadados do PDF
@@ -108,69 +133,107 @@ class PDFReader:
                     "producer": pdf_metadata.get("producer", ""),
                     "subject": pdf_metadata.get("subject", ""),
                 })
-            
-            doc.close()
         except Exception as e:
             logger.warning(f"Erro ao extrair metadados: {e}")
         
         return metadata
     
-    def _convert_to_images(self, pdf_path: Path) -> Generator[Page, None, None]:
+    def _convert_to_images(self, doc: "fitz.Document") -> Generator[Page, None, None]:
         """
         Converte páginas do PDF para imagens usando PyMuPDF.
         
+        A renderização é o passo mais caro da leitura e ocupa um núcleo por
+        página. A partir de PARALLEL_RENDER_MIN_PAGES páginas ela é feita
+        em um pool de processos (o MuPDF não pode ser usado por várias
+        threads), com no máximo RENDER_PAGES_PER_WORKER páginas por
+        processo em andamento; as páginas são entregues em ordem.
+        
         Args:
-            pdf_path: Caminho para o arquivo PDF.
+            doc: Documento PyMuPDF já aberto (fechado por quem o abriu).
         
         Yields:
             Page: Página com imagem convertida.
         """
         try:
-            doc = fitz.open(pdf_path)
-            
-            # Matriz de transformação para o DPI desejado
-            mat = fitz.Matrix(self.zoom, self.zoom)
+            page_count = len(doc)
+            workers = min(os.cpu_count() or 1, page_count)
             
-            for page_num in range(len(doc)):
-                fitz_page = doc[page_num]
-                
-                # Renderiza página como pixmap (imagem)
-                pixmap = fitz_page.get_pixmap(matrix=mat, alpha=False)
-                
-                # Converte pixmap para numpy array RGB
-                # PyMuPDF retorna dados em formato RGB
-                np_image = np.frombuffer(pixmap.samples, dtype=np.uint8)
-                np_image = np_image.reshape(pixmap.height, pixmap.width, pixmap.n)
-                
-                # Se tiver 4 canais (RGBA), converte para RGB
-                if pixmap.n == 4:
-                    np_image = np_image[:, :, :3]
-                
-                # Cria PageImage
-                page_image = PageImage(
-                    page_number=page_num + 1,  # 1-indexed
-                    image=np_image,
-                    width=pixmap.width,
-                    height=pixmap.height,
-                    dpi=self.dpi
-                )
+            if page_count < PARALLEL_RENDER_MIN_PAGES or workers < 2:
+                # Matriz de transformação para o DPI desejado
+                mat = fitz.Matrix(self.zoom, self.zoom)
                 
-                # Cria Page
-                page = Page(
-                    number=page_num + 1,  # 1-indexed
-                    image=page_image
+                for page_num in range(page_count):
+                    fitz_page = doc[page_num]
+                    
+                    # Renderiza página como pixmap (imagem RGB, 3 canais)
+                    pixmap = fitz_page.get_pixmap(
+                        matrix=mat, colorspace=fitz.csRGB, alpha=False
+                    )
+                    
+                    # Converte pixmap para numpy array RGB
+                    np_image = _pixmap_to_array(pixmap)
+                    
+                    # Libera o pixmap antes de entregar a página: só um buffer
+                    # de renderização fica vivo por vez e o malloc reaproveita
+                    # o mesmo bloco na página seguinte
+                    del pixmap
+                    
+                    yield self._make_page(page_num + 1, np_image)
+                return
+            
+            # Cada processo abre o PDF uma vez e renderiza as páginas pedidas
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_render_worker,
+                initargs=(doc.name, self.zoom)
+            ) as executor:
+                # Janela limitada de tarefas: as imagens prontas não se
+                # acumulam no pipe enquanto as anteriores são consumidas
+                window = RENDER_PAGES_PER_WORKER * workers
+                pending: Deque[Future] = deque(
+                    executor.submit(_render_page_worker, page_idx)
+                    for page_idx in range(min(window, page_count))
                 )
+                next_idx = len(pending)
                 
-                logger.debug(f"Página {page_num + 1} convertida: {pixmap.width}x{pixmap.height}")
-                
-                yield page
-            
-            doc.close()
+                for page_num in range(1, page_count + 1):
+                    np_image = pending.popleft().result()
+                    if next_idx < page_count:
+                        pending.append(executor.submit(_render_page_worker, next_idx))
+                        next_idx += 1
+                    yield self._make_page(page_num, np_image)
                 
         except Exception as e:
             logger.error(f"Erro ao converter PDF para imagens: {e}")
             raise
     
+    def _make_page(self, page_number: int, np_image: np.ndarray) -> Page:
+        """
+        Cria a Page (com PageImage) de uma página renderizada.
+        
+        Args:
+            page_number: Número da página (1-indexed).
+            np_image: Imagem RGB da página.
+        
+        Returns:
+            Page: Página com imagem.
+        """
+        height, width = np_image.shape[:2]
+        
+        # Cria PageImage
+        page_image = PageImage(
+            page_number=page_number,
+            image=np_image,
+            width=width,
+            height=height,
+            dpi=self.dpi
+        )
+        
+        logger.debug(f"Página {page_number} convertida: {width}x{height}")
+        
+        # Cria Page
+        return Page(number=page_number, image=page_image)
+    
     def get_page_count(self, pdf_path: Path) -> int:
         """
         Retorna o número de páginas do PDF sem carregar as imagens.
@@ -182,14 +245,22 @@ class PDFReader:
             int: Número de páginas.
         """
         try:
-            doc = fitz.open(pdf_path)
-            count = len(doc)
-            doc.close()
+            key = self._count_key(Path(pdf_path))
+            count = self._count_cache.get(key)
+            if count is None:
+                with fitz.open(pdf_path) as doc:
+                    count = len(doc)
+                self._count_cache[key] = count
             return count
         except Exception as e:
             logger.error(f"Erro ao contar páginas: {e}")
             return 0
     
+    @staticmethod
+    def _count_key(pdf_path: Path) -> Tuple[Path, float]:
+        """Chave do cache de contagem (muda se o arquivo for alterado)."""
+        return pdf_path, pdf_path.stat().st_mtime
+    
     def read_single_page(self, pdf_path: Path, page_number: int) -> Optional[Page]:
         """
         Lê uma única página do PDF.
@@ -217,15 +288,13 @@ class PDFReader:
             # Matriz de transformação para o DPI desejado
             mat = fitz.Matrix(self.zoom, self.zoom)
             
-            # Renderiza página como pixmap
-            pixmap = fitz_page.get_pixmap(matrix=mat, alpha=False)
+            # Renderiza página como pixmap (imagem RGB, 3 canais)
+            pixmap = fitz_page.get_pixmap(
+                matrix=mat, colorspace=fitz.csRGB, alpha=False
+            )
             
             # Converte para numpy array
-            np_image = np.frombuffer(pixmap.samples, dtype=np.uint8)
-            np_image = np_image.reshape(pixmap.height, pixmap.width, pixmap.n)
-            
-            if pixmap.n == 4:
-                np_image = np_image[:, :, :3]
+            np_image = _pixmap_to_array(pixmap)
             
             page_image = PageImage(
                 page_number=page_number,
@@ -243,32 +312,45 @@ class PDFReader:
             logger.error(f"Erro ao ler página {page_number}: {e}")
             return None
     
-    def extract_text(self, pdf_path: Path) -> str:
+    def extract_text(
+        self,
+        pdf_path: Path,
+        out: Optional[IO[str]] = None
+    ) -> Optional[str]:
         """
         Extrai texto de todas as páginas do PDF.
         
         Args:
             pdf_path: Caminho para o arquivo PDF.
+            out: Arquivo (texto) onde gravar o resultado página a página,
+                sem manter o texto todo em memória.
         
         Returns:
-            str: Texto extraído de todas as páginas.
+            Optional[str]: Texto extraído de todas as páginas, ou None se
+            gravado em out.
         """
         try:
-            doc = fitz.open(pdf_path)
-            text_parts = []
-            
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                text = page.get_text()
-                if text.strip():
-                    text_parts.append(f"--- Página {page_num + 1} ---\n{text}")
-            
-            doc.close()
-            return "\n\n".join(text_parts)
+            with fitz.open(pdf_path) as doc:
+                sections = (
+                    f"--- Página {page_num} ---\n{text}"
+                    for page_num, text in enumerate(
+                        (page.get_text() for page in doc), start=1
+                    )
+                    if text.strip()
+                )
+                
+                if out is None:
+                    return "\n\n".join(sections)
+                
+                for i, section in enumerate(sections):
+                    if i:
+                        out.write("\n\n")
+                    out.write(section)
+                return None
             
         except Exception as e:
             logger.error(f"Erro ao extrair texto: {e}")
-            return ""
+            return "" if out is None else None
     
     def extract_text_from_page(self, pdf_path: Path, page_number: int) -> str:
         """
@@ -296,3 +378,36 @@ class PDFReader:
         except Exception as e:
             logger.error(f"Erro ao extrair texto da página {page_number}: {e}")
             return ""
+
+
+def _pixmap_to_array(pixmap: "fitz.Pixmap") -> np.ndarray:
+    """
+    Copia os pixels de um pixmap RGB para um array numpy (altura, largura, 3).
+    
+    Lê direto do buffer interno (samples_mv) com uma única cópia; o
+    pixmap.samples criaria um bytes intermediário e o array resultante
+    seria somente leitura. A cópia é necessária porque o buffer deixa de
+    valer quando o pixmap é liberado.
+    """
+    view = np.frombuffer(pixmap.samples_mv, dtype=np.uint8)
+    return view.reshape(pixmap.height, pixmap.width, pixmap.n).copy()
+
+
+# Estado dos processos de renderização (um documento aberto por processo)
+_render_doc: Optional["fitz.Document"] = None
+_render_matrix: Optional["fitz.Matrix"] = None
+
+
+def _init_render_worker(pdf_path: str, zoom: float) -> None:
+    """Abre o PDF no processo do pool de renderização."""
+    global _render_doc, _render_matrix
+    _render_doc = fitz.open(pdf_path)
+    _render_matrix = fitz.Matrix(zoom, zoom)
+
+
+def _render_page_worker(page_idx: int) -> np.ndarray:
+    """Renderiza uma página (0-indexed) em um processo do pool."""
+    pixmap = _render_doc[page_idx].get_pixmap(
+        matrix=_render_matrix, colorspace=fitz.csRGB, alpha=False
+    )
+    return _pixmap_to_array(pixmap)
@@ -2,13 +2,22 @@
 
 from __future__ import annotations
 
+import heapq
 import logging
-import re
+import os
+import threading
 import time
-from typing import List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from itertools import chain
+from operator import attrgetter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 from config.settings import Settings, get_settings
-from models.document import Document
+from models.document import Document, Page
 from models.search_result import (
     SearchResult,
     SearchMatch,
@@ -30,6 +39,19 @@ class TextSearcher:
     relevantes no texto extraído do PDF.
     """
     
+    # A partir de quantos termos distintos a busca usa um autômato
+    # Aho-Corasick (abaixo disso, str.find por termo é mais barato)
+    AUTOMATON_MIN_TERMS = 3
+    
+    # Máximo de conjuntos de termos com autômato memorizado
+    AUTOMATON_CACHE_SIZE = 256
+    
+    # Máximo de pares (query, texto da página) com passagens memorizadas
+    SEMANTIC_CACHE_SIZE = 1024
+    
+    # Máximo de queries lembradas para o cache por similaridade
+    QUERY_CACHE_SIZE = 256
+    
     def __init__(
         self,
         settings: Optional[Settings] = None,
@@ -46,6 +68,26 @@ class TextSearcher:
         self.settings = settings or get_settings()
         self._nlp_processor = nlp_processor
         self._context_size = 100  # Caracteres de contexto
+        
+        # Autômato por conjunto de termos: buscas repetidas com a mesma
+        # instrução reaproveitam o autômato já montado
+        self._term_automaton = lru_cache(maxsize=self.AUTOMATON_CACHE_SIZE)(
+            self._build_term_automaton
+        )
+        
+        # Passagens por (query, texto da página): novas buscas no mesmo
+        # documento (reexecuções, REPL) e instruções com a mesma query
+        # não chamam o NLP de novo (acesso sob lock: a busca usa threads)
+        self._passages_cache: OrderedDict[
+            Tuple[str, str], Tuple[Tuple[str, float, int], ...]
+        ] = OrderedDict()
+        self._passages_lock = threading.Lock()
+        
+        # Queries já buscadas e seus embeddings normalizados (mais recente
+        # por último), para reusar passagens de queries parecidas
+        self._known_queries: List[str] = []
+        self._query_vectors: List[np.ndarray] = []
+        self._query_matrix: Optional[np.ndarray] = None
     
     @property
     def nlp_processor(self) -> BaseNLPProcessor:
@@ -132,9 +174,10 @@ class TextSearcher:
             all_matches = self._deduplicate_matches(all_matches)
         
         # Limita número de resultados
+        # (seleção parcial: equivale a ordenar por score e cortar, inclusive
+        # na ordem dos empates)
         max_results = self.settings.search.max_results
-        all_matches = sorted(all_matches, key=lambda m: m.score, reverse=True)
-        all_matches = all_matches[:max_results]
+        all_matches = heapq.nlargest(max_results, all_matches, key=attrgetter("score"))
         
         for match in all_matches:
             match_result.add_match(match)
@@ -161,23 +204,26 @@ class TextSearcher:
         if not instruction.search_terms:
             return matches
         
+        # Termos e texto já em minúsculas: busca direta, sem regex nem
+        # IGNORECASE (termos vazios não têm o que destacar)
+        terms_lower = [term.lower() for term in instruction.search_terms]
+        terms_lower = [term for term in terms_lower if term]
+        
+        # Com vários termos, uma única passada por página encontra todos
+        unique_terms = tuple(sorted(set(terms_lower)))
+        automaton = None
+        if len(unique_terms) >= self.AUTOMATON_MIN_TERMS:
+            automaton = self._term_automaton(unique_terms)
+        
         for page in document.pages:
             if not page.text:
                 continue
             
-            text_lower = page.text.lower()
+            spans = self._find_term_spans(page.text_lower, unique_terms, automaton)
             
-            for term in instruction.search_terms:
-                term_lower = term.lower()
-                
-                # Busca todas as ocorrências
-                for match in re.finditer(
-                    re.escape(term_lower),
-                    text_lower,
-                    re.IGNORECASE
-                ):
-                    start, end = match.span()
-                    
+            # Mantém a ordem dos termos da instrução
+            for term_lower in terms_lower:
+                for start, end in spans.get(term_lower, ()):
                     # Obtém texto original (com capitalização)
                     original_text = page.text[start:end]
                     
@@ -206,6 +252,71 @@ class TextSearcher:
         
         return matches
     
+    @staticmethod
+    def _build_term_automaton(terms: Tuple[str, ...]):
+        """
+        Monta um autômato Aho-Corasick com os termos (já em minúsculas).
+        
+        Retorna None se pyahocorasick não estiver instalado, caso em que
+        a busca termo a termo é usada.
+        """
+        try:
+            import ahocorasick
+        except ImportError:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for term in terms:
+            automaton.add_word(term, term)
+        automaton.make_automaton()
+        return automaton
+    
+    @staticmethod
+    def _find_term_spans(
+        text_lower: str,
+        terms: Tuple[str, ...],
+        automaton=None
+    ) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Localiza as ocorrências de cada termo no texto.
+        
+        Como em re.finditer, as ocorrências de um mesmo termo não se
+        sobrepõem (as de termos diferentes podem se sobrepor).
+        
+        Args:
+            text_lower: Texto em minúsculas.
+            terms: Termos distintos, em minúsculas.
+            automaton: Autômato de _build_term_automaton, se houver.
+        
+        Returns:
+            Dict[str, List[Tuple[int, int]]]: (início, fim) por termo.
+        """
+        spans: Dict[str, List[Tuple[int, int]]] = {}
+        
+        if automaton is None:
+            for term in terms:
+                term_length = len(term)
+                term_spans = []
+                start = text_lower.find(term)
+                while start != -1:
+                    end = start + term_length
+                    term_spans.append((start, end))
+                    start = text_lower.find(term, end)
+                if term_spans:
+                    spans[term] = term_spans
+            return spans
+        
+        # O autômato reporta as ocorrências pela posição final; descarta as
+        # que se sobrepõem à anterior do mesmo termo
+        for last_index, term in automaton.iter(text_lower):
+            end = last_index + 1
+            start = end - len(term)
+            term_spans = spans.setdefault(term, [])
+            if not term_spans or start >= term_spans[-1][1]:
+                term_spans.append((start, end))
+        
+        return spans
+    
     def _semantic_search(
         self,
         document: Document,
@@ -221,61 +332,188 @@ class TextSearcher:
         Returns:
             List[SearchMatch]: Matches encontrados.
         """
-        matches = []
-        
         query = instruction.semantic_query
         if not query:
             query = instruction.raw_text
+        query = self._equivalent_query(query)
+        
+        pages = [page for page in document.pages if page.text]
+        search_page = partial(self._semantic_search_page, query)
+        
+        # As páginas são independentes e o trabalho do NLP (embeddings em
+        # torch/numpy ou chamadas HTTP ao LLM) libera o GIL: com
+        # search.semantic_workers > 1, busca as páginas em threads
+        # (mantendo a ordem). O padrão é em sequência: o torch já usa
+        # vários núcleos por chamada e as APIs limitam requisições
+        workers = min(
+            self.settings.search.semantic_workers,
+            os.cpu_count() or 1,
+            len(pages),
+        )
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                page_matches = list(executor.map(search_page, pages))
+        else:
+            page_matches = map(search_page, pages)
         
-        for page in document.pages:
-            if not page.text:
-                continue
+        return list(chain.from_iterable(page_matches))
+    
+    def _equivalent_query(self, query: str) -> str:
+        """
+        Retorna uma query já buscada equivalente à query, se houver.
+        
+        Duas queries são equivalentes quando a similaridade de cosseno
+        dos embeddings atinge search.semantic_cache_similarity; a query
+        anterior é usada para que as passagens memorizadas sejam reusadas.
+        
+        Args:
+            query: Query semântica.
+        
+        Returns:
+            str: Query anterior equivalente ou a própria query.
+        """
+        threshold = self.settings.search.semantic_cache_similarity
+        if threshold <= 0:
+            return query
+        
+        known = self._known_queries
+        if query in known:
+            index = known.index(query)
+        else:
+            vector = self.nlp_processor.embed_query(query)
+            if vector is None:
+                return query
             
-            # Usa NLP para encontrar passagens similares
-            try:
-                similar_passages = self.nlp_processor.find_similar_passages(
-                    query=query,
-                    text=page.text,
-                    top_k=5
+            vector = np.asarray(vector, dtype=np.float32).ravel()
+            norm = np.linalg.norm(vector)
+            if not norm:
+                return query
+            vector = vector / norm
+            
+            index = -1
+            if known:
+                if self._query_matrix is None:
+                    self._query_matrix = np.stack(self._query_vectors)
+                similarities = self._query_matrix @ vector
+                best = int(similarities.argmax())
+                if similarities[best] >= threshold:
+                    index = best
+                    logger.debug(
+                        f"Query '{query}' equivalente a '{known[best]}' "
+                        f"(similaridade {similarities[best]:.2f})"
+                    )
+            
+            if index == -1:
+                # Query nova: lembra dela, descartando a menos usada
+                if len(known) >= self.QUERY_CACHE_SIZE:
+                    del known[0], self._query_vectors[0]
+                known.append(query)
+                self._query_vectors.append(vector)
+                self._query_matrix = None
+                return query
+        
+        # Marca a query encontrada como a mais recente
+        if index != len(known) - 1:
+            known.append(known.pop(index))
+            self._query_vectors.append(self._query_vectors.pop(index))
+            self._query_matrix = None
+        return known[-1]
+    
+    def _semantic_search_page(self, query: str, page: Page) -> List[SearchMatch]:
+        """
+        Busca semântica em uma página.
+        
+        Args:
+            query: Query semântica.
+            page: Página com texto.
+        
+        Returns:
+            List[SearchMatch]: Matches da página.
+        """
+        matches = []
+        
+        # Usa NLP para encontrar passagens similares
+        try:
+            similar_passages = self._similar_passages(query, page.text)
+            
+            for passage, score, position in similar_passages:
+                if score < self.settings.nlp.local.similarity_threshold:
+                    continue
+                
+                # Encontra posição real no texto da página
+                actual_pos = page.text.find(passage)
+                if actual_pos == -1:
+                    actual_pos = position
+                
+                context_before, context_after = self._get_context(
+                    page.text,
+                    actual_pos,
+                    actual_pos + len(passage)
                 )
                 
-                for passage, score, position in similar_passages:
-                    if score < self.settings.nlp.local.similarity_threshold:
-                        continue
-                    
-                    # Encontra posição real no texto da página
-                    actual_pos = page.text.find(passage)
-                    if actual_pos == -1:
-                        actual_pos = position
-                    
-                    context_before, context_after = self._get_context(
-                        page.text,
-                        actual_pos,
-                        actual_pos + len(passage)
-                    )
-                    
-                    search_match = SearchMatch(
-                        text=passage,
-                        position=TextPosition(
-                            page=page.number,
-                            start_char=actual_pos,
-                            end_char=actual_pos + len(passage)
-                        ),
-                        score=score,
-                        context_before=context_before,
-                        context_after=context_after,
-                        match_type="semantic"
-                    )
-                    
-                    matches.append(search_match)
-                    
-            except Exception as e:
-                logger.warning(
-                    f"Erro na busca semântica página {page.number}: {e}"
+                search_match = SearchMatch(
+                    text=passage,
+                    position=TextPosition(
+                        page=page.number,
+                        start_char=actual_pos,
+                        end_char=actual_pos + len(passage)
+                    ),
+                    score=score,
+                    context_before=context_before,
+                    context_after=context_after,
+                    match_type="semantic"
                 )
+                
+                matches.append(search_match)
+                
+        except Exception as e:
+            logger.warning(
+                f"Erro na busca semântica página {page.number}: {e}"
+            )
         
         return matches
     
+    def _similar_passages(
+        self,
+        query: str,
+        text: str
+    ) -> Tuple[Tuple[str, float, int], ...]:
+        """
+        Passagens similares à query no texto, memorizadas por (query, texto).
+        
+        Resultados vazios não são memorizados: o processador em nuvem
+        devolve [] também em falhas transitórias (limite de requisições,
+        timeout), e a próxima busca deve tentar de novo.
+        
+        Args:
+            query: Query semântica.
+            text: Texto da página.
+        
+        Returns:
+            Tuple[Tuple[str, float, int], ...]: (passagem, score, posição).
+        """
+        key = (query, text)
+        with self._passages_lock:
+            passages = self._passages_cache.get(key)
+            if passages is not None:
+                self._passages_cache.move_to_end(key)
+                return passages
+        
+        passages = tuple(self.nlp_processor.find_similar_passages(
+            query=query,
+            text=text,
+            top_k=5
+        ))
+        
+        if passages:
+            with self._passages_lock:
+                self._passages_cache[key] = passages
+                self._passages_cache.move_to_end(key)
+                if len(self._passages_cache) > self.SEMANTIC_CACHE_SIZE:
+                    self._passages_cache.popitem(last=False)
+        
+        return passages
+    
     def _get_context(
         self,
         text: str,
@@ -293,25 +531,25 @@ class TextSearcher:
         Returns:
             Tuple[str, str]: (contexto_antes, contexto_depois)
         """
-        # Contexto antes
+        # Contexto antes: sem os espaços das pontas e, se a janela não
+        # começa no início do texto, a partir da primeira palavra inteira.
+        # Só os limites são ajustados; o texto é recortado uma única vez
         context_start = max(0, start - self._context_size)
-        context_before = text[context_start:start].strip()
-        
-        # Limpa até início de palavra
-        if context_start > 0 and context_before:
-            space_pos = context_before.find(" ")
+        lo, hi = _strip_bounds(text, context_start, start)
+        if context_start > 0 and lo < hi:
+            space_pos = text.find(" ", lo, hi)
             if space_pos != -1:
-                context_before = context_before[space_pos + 1:]
+                lo = space_pos + 1
+        context_before = text[lo:hi]
         
-        # Contexto depois
+        # Contexto depois: até a última palavra inteira da janela
         context_end = min(len(text), end + self._context_size)
-        context_after = text[end:context_end].strip()
-        
-        # Limpa até fim de palavra
-        if context_end < len(text) and context_after:
-            space_pos = context_after.rfind(" ")
+        lo, hi = _strip_bounds(text, end, context_end)
+        if context_end < len(text) and lo < hi:
+            space_pos = text.rfind(" ", lo, hi)
             if space_pos != -1:
-                context_after = context_after[:space_pos]
+                hi = space_pos
+        context_after = text[lo:hi]
         
         return context_before, context_after
     
@@ -342,45 +580,33 @@ class TextSearcher:
         result = []
         
         for page_matches in by_page.values():
-            # Ordena por posição
-            page_matches.sort(key=lambda m: m.position.start_char)
+            # Ordena por posição (no mesmo início, o de maior score primeiro)
+            page_matches.sort(key=lambda m: (m.position.start_char, -m.score))
             
-            # Remove sobreposições, mantendo o de maior score
+            # Remove sobreposições, mantendo o de maior score. Os mantidos
+            # ficam ordenados e sem sobreposição, então basta comparar com
+            # o último (varredura linear em vez de comparar com todos)
             deduped = []
+            last_start = last_end = 0
             
             for match in page_matches:
-                # Verifica se sobrepõe com algum existente
-                overlaps = False
-                for i, existing in enumerate(deduped):
-                    if self._ranges_overlap(
-                        match.position.start_char,
-                        match.position.end_char,
-                        existing.position.start_char,
-                        existing.position.end_char
-                    ):
-                        overlaps = True
-                        # Mantém o de maior score
-                        if match.score > existing.score:
-                            deduped[i] = match
-                        break
+                position = match.position
+                start, end = position.start_char, position.end_char
                 
-                if not overlaps:
+                # Sobrepõe o último mantido?
+                if deduped and start < last_end and last_start < end:
+                    # Mantém o de maior score
+                    if match.score > deduped[-1].score:
+                        deduped[-1] = match
+                        last_start, last_end = start, end
+                else:
                     deduped.append(match)
+                    last_start, last_end = start, end
             
             result.extend(deduped)
         
         return result
     
-    def _ranges_overlap(
-        self,
-        start1: int,
-        end1: int,
-        start2: int,
-        end2: int
-    ) -> bool:
-        """Verifica se dois ranges se sobrepõem."""
-        return start1 < end2 and start2 < end1
-    
     def quick_search(
         self,
         document: Document,
@@ -398,17 +624,18 @@ class TextSearcher:
         """
         matches = []
         
+        query_lower = query.lower()
+        if not query_lower:
+            return matches
+        
         for page in document.pages:
             if not page.text:
                 continue
             
-            for match in re.finditer(
-                re.escape(query),
-                page.text,
-                re.IGNORECASE
-            ):
-                start, end = match.span()
-                
+            # Reaproveita o texto em minúsculas já calculado para a página
+            spans = self._find_term_spans(page.text_lower, (query_lower,))
+            
+            for start, end in spans.get(query_lower, ()):
                 context_before, context_after = self._get_context(
                     page.text, start, end
                 )
@@ -429,3 +656,12 @@ class TextSearcher:
                 matches.append(search_match)
         
         return matches
+
+
+def _strip_bounds(text: str, start: int, end: int) -> Tuple[int, int]:
+    """Limites de text[start:end].strip(), sem recortar o texto."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
@@ -4,9 +4,9 @@ from __future__ import annotations
 
 import logging
 import re
-import unicodedata
 from collections import Counter
-from typing import List, Optional, Tuple
+from itertools import islice
+from typing import List, Optional, Set, Tuple
 
 from config.settings import Settings, get_settings
 from models.document import Document
@@ -18,12 +18,19 @@ from models.extraction_result import (
 
 logger = logging.getLogger(__name__)
 
+# Caracteres de controle (categoria Unicode Cc), exceto \n, \r e \t
+_CONTROL_CHARS_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]")
+
+# Trecho entre terminadores ([.!?]) com algum caractere não-branco:
+# cada ocorrência é uma sentença não vazia de re.split(r"[.!?]+", ...)
+_SENTENCE_RE = re.compile(r"[^.!?]*?[^.!?\s][^.!?]*")
+
 
 class TextValidator:
     """Validador de qualidade do texto extraído por OCR."""
     
     # Palavras comuns em português para validação
-    COMMON_PORTUGUESE_WORDS = {
+    COMMON_PORTUGUESE_WORDS = frozenset({
         "de", "da", "do", "e", "que", "o", "a", "os", "as", "em", "um", "uma",
         "para", "com", "não", "se", "na", "no", "por", "mais", "foi", "são",
         "como", "mas", "ao", "ser", "seu", "sua", "ou", "quando", "muito",
@@ -31,7 +38,13 @@ class TextValidator:
         "entre", "depois", "sem", "mesmo", "aos", "seus", "ter", "suas",
         "contrato", "locação", "imóvel", "locador", "locatário", "aluguel",
         "prazo", "valor", "cláusula", "parágrafo", "artigo", "lei"
-    }
+    })
+    
+    # Palavras exclusivas do português
+    PORTUGUESE_MARKERS = frozenset({
+        "não", "são", "você", "está", "também", "já", "há",
+        "então", "porém", "através", "após", "além", "até"
+    })
     
     # Padrões que indicam problemas de OCR
     OCR_ERROR_PATTERNS = [
@@ -83,12 +96,16 @@ class TextValidator:
             result.add_issue(f"Problemas de encoding: {', '.join(encoding_issues)}")
             metrics.encoding_valid = False
         
+        # Palavras em minúsculas, compartilhadas por coerência e idioma
+        words = text.lower().split()
+        word_set = set(words)
+        
         # Verifica coerência
-        coherence_score = self._calculate_coherence(text)
+        coherence_score = self._calculate_coherence(words, word_set)
         metrics.coherence_score = coherence_score
         
         # Detecta idioma
-        language, confidence = self._detect_language(text)
+        language, confidence = self._detect_language(word_set)
         metrics.detected_language = language
         metrics.language_confidence = confidence
         
@@ -123,16 +140,14 @@ class TextValidator:
         words = text.split()
         metrics.word_count = len(words)
         
-        # Contagem de sentenças
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        metrics.sentence_count = len(sentences)
+        # Contagem de sentenças (conta direto, sem montar a lista de trechos)
+        metrics.sentence_count = sum(1 for _ in _SENTENCE_RE.finditer(text))
         
         # Tamanho médio das palavras
         if words:
-            word_lengths = [len(w) for w in words if w.isalpha()]
+            alpha_words = list(filter(str.isalpha, words))
             metrics.avg_word_length = (
-                sum(word_lengths) / len(word_lengths) if word_lengths else 0
+                sum(map(len, alpha_words)) / len(alpha_words) if alpha_words else 0
             )
         
         return metrics
@@ -154,18 +169,19 @@ class TextValidator:
             issues.append("Caracteres de substituição Unicode encontrados")
         
         # Verifica caracteres de controle inválidos
-        control_chars = sum(1 for c in text if unicodedata.category(c) == 'Cc' and c not in '\n\r\t')
+        control_chars = len(_CONTROL_CHARS_RE.findall(text))
         if control_chars > 0:
             issues.append(f"{control_chars} caracteres de controle encontrados")
         
         # Verifica proporção de caracteres não-ASCII suspeitos
-        non_ascii = sum(1 for c in text if ord(c) > 127)
+        # (o encode descarta os não-ASCII em C, sem laço por caractere)
+        non_ascii = len(text) - len(text.encode("ascii", "ignore"))
         if len(text) > 0 and non_ascii / len(text) > 0.3:
             issues.append("Alta proporção de caracteres não-ASCII")
         
         return len(issues) == 0, issues
     
-    def _calculate_coherence(self, text: str) -> float:
+    def _calculate_coherence(self, words: List[str], word_set: Set[str]) -> float:
         """
         Calcula score de coerência do texto.
         
@@ -173,23 +189,20 @@ class TextValidator:
         para determinar se o texto faz sentido.
         
         Args:
-            text: Texto para análise.
+            words: Palavras do texto, em minúsculas.
+            word_set: Conjunto de words.
         
         Returns:
             float: Score de coerência (0-1).
         """
-        words = text.lower().split()
-        
         if len(words) < 10:
             return 0.0
         
         # Conta palavras comuns
-        word_set = set(words)
-        common_count = len(word_set.intersection(self.COMMON_PORTUGUESE_WORDS))
+        common_count = len(word_set & self.COMMON_PORTUGUESE_WORDS)
         
         # Calcula proporção de palavras válidas (alfabéticas)
-        alpha_words = [w for w in words if w.isalpha()]
-        alpha_ratio = len(alpha_words) / len(words) if words else 0
+        alpha_ratio = sum(map(str.isalpha, words)) / len(words)
         
         # Calcula score baseado em palavras comuns e alfabéticas
         common_ratio = common_count / len(self.COMMON_PORTUGUESE_WORDS)
@@ -199,29 +212,21 @@ class TextValidator:
         
         return min(coherence, 1.0)
     
-    def _detect_language(self, text: str) -> Tuple[str, float]:
+    def _detect_language(self, word_set: Set[str]) -> Tuple[str, float]:
         """
         Detecta o idioma do texto.
         
         Usa análise de frequência de palavras para detecção simples.
         
         Args:
-            text: Texto para análise.
+            word_set: Conjunto das palavras do texto, em minúsculas.
         
         Returns:
             Tuple[str, float]: (código do idioma, confiança)
         """
-        words = set(text.lower().split())
-        
-        # Palavras exclusivas do português
-        portuguese_markers = {
-            "não", "são", "você", "está", "também", "já", "há",
-            "então", "porém", "através", "após", "além", "até"
-        }
-        
         # Conta marcadores encontrados
-        found_markers = len(words.intersection(portuguese_markers))
-        found_common = len(words.intersection(self.COMMON_PORTUGUESE_WORDS))
+        found_markers = len(word_set & self.PORTUGUESE_MARKERS)
+        found_common = len(word_set & self.COMMON_PORTUGUESE_WORDS)
         
         # Calcula confiança
         total_indicators = found_markers * 2 + found_common
@@ -245,12 +250,17 @@ class TextValidator:
         errors = []
         
         for pattern in self._compiled_patterns:
-            matches = pattern.findall(text)
-            for match in matches[:3]:  # Limita a 3 por padrão
-                if isinstance(match, tuple):
-                    match = match[0]
-                if len(match) > 1:
-                    errors.append(f"Padrão suspeito: '{match[:20]}...'")
+            # Só as 3 primeiras ocorrências de cada padrão são usadas: a
+            # varredura para nelas em vez de percorrer o texto todo.
+            # Como no findall, padrões com grupo reportam o primeiro grupo
+            group = 1 if pattern.groups else 0
+            for match in islice(pattern.finditer(text), 3):
+                found = match.group(group)
+                if len(found) > 1:
+                    errors.append(f"Padrão suspeito: '{found[:20]}...'")
+            
+            if len(errors) >= 10:
+                break
         
         return errors[:10]  # Limita total de erros
     
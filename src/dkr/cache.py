@@ -259,7 +259,7 @@ class DKRCache:
             }
             
             with open(meta_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+                json.dump(data, f, separators=(",", ":"))
                 
         except Exception as e:
             logger.warning(f"Erro ao salvar metadata DKR: {e}")
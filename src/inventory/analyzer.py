@@ -223,7 +223,10 @@ class InventoryAnalyzer:
                 {"number": p.number, "text": p.text}
                 for p in self._document.pages
             ]
-            ocr_cache.save(pdf_path, pages_data, ocr_time)
+            ocr_cache.save(
+                pdf_path, pages_data, ocr_time,
+                total_words=sum(p.word_count for p in self._document.pages)
+            )
         
         # Indexa no RAG
         self.rag.index_document(self._document)
@@ -24,7 +24,6 @@ from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
 import click
-import yaml
 
 # Configura encoding UTF-8 para Windows ANTES de qualquer output
 from utils.console_utils import setup_encoding, get_console, get_printer, ASCII_CHARS
@@ -67,12 +66,13 @@ AVAILABLE_PROFILES = {
 
 def get_active_profile() -> str:
     """Obtém o perfil ativo da configuração."""
+    from config.settings import load_yaml
+    
     config_path = Path(__file__).parent.parent / "config.yaml"
     if config_path.exists():
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = yaml.safe_load(f)
-                return config.get("analysis", {}).get("active_profile", "inventory")
+            config = load_yaml(config_path)
+            return config.get("analysis", {}).get("active_profile", "inventory")
         except Exception:
             pass
     return "inventory"
@@ -310,7 +310,7 @@ def analyze(
 
 def _create_rag_config():
     """Cria RAGConfig baseado nas configurações do arquivo YAML."""
-    from config.settings import get_settings
+    from config.settings import get_settings, load_yaml
     from rag.rag_pipeline import RAGConfig
     from rag.chunker import ChunkingStrategy
     
@@ -334,8 +334,7 @@ def _create_rag_config():
     # Carrega configurações do YAML se existir
     if config_path.exists():
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                yaml_config = yaml.safe_load(f)
+            yaml_config = load_yaml(config_path)
             
             # Chunking
             chunking = yaml_config.get("rag", {}).get("chunking", {})
@@ -610,7 +609,10 @@ def extract(pdf_path: str, output: str, no_cache: bool):
                 {"number": p.number, "text": p.text}
                 for p in document.pages
             ]
-            ocr_cache.save(pdf_path, pages_data, ocr_time)
+            ocr_cache.save(
+                pdf_path, pages_data, ocr_time,
+                total_words=sum(p.word_count for p in document.pages)
+            )
             console.print(f"[green][CACHE] Texto salvo no cache ({ocr_time:.1f}s)[/green]")
     
     # Salva texto
@@ -707,18 +709,18 @@ def info(ctx: Context):
     except Exception as e:
         console.print(f"  [ERRO] Tesseract: {e}", style="red")
     
-    # FAISS
-    try:
-        import faiss
+    # FAISS e Sentence Transformers: apenas verifica se estao instalados,
+    # sem importar (evita carregar torch/CUDA so para exibir o status)
+    from importlib.util import find_spec
+    
+    if find_spec("faiss") is not None:
         console.print("  [OK] FAISS disponivel", style="green")
-    except ImportError:
+    else:
         console.print("  [ERRO] FAISS nao instalado", style="red")
     
-    # Sentence Transformers
-    try:
-        from sentence_transformers import SentenceTransformer
+    if find_spec("sentence_transformers") is not None:
         console.print("  [OK] Sentence Transformers disponivel", style="green")
-    except ImportError:
+    else:
         console.print("  [ERRO] Sentence Transformers nao instalado", style="red")
 
 
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 import numpy as np
 
@@ -34,11 +34,22 @@ class Page:
     image: Optional[PageImage] = None
     word_count: int = 0
     confidence: float = 0.0
+    _text_lower: Optional[Tuple[str, str]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
     
     def __post_init__(self):
         """Calcula contagem de palavras após inicialização."""
         if self.text and self.word_count == 0:
             self.word_count = len(self.text.split())
+    
+    @property
+    def text_lower(self) -> str:
+        """Texto em minúsculas (calculado uma vez por valor de text)."""
+        cached = self._text_lower
+        if cached is None or cached[0] is not self.text:
+            cached = self._text_lower = (self.text, self.text.lower())
+        return cached[1]
 
 
 @dataclass
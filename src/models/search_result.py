@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
+from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 
 @dataclass
@@ -153,6 +154,19 @@ class SearchResult:
                 texts.append(match.text)
         return texts
     
+    def matches_by_page(self) -> Dict[int, List[SearchMatch]]:
+        """
+        Agrupa todos os matches por página em uma única passada.
+        
+        Equivale a chamar get_matches_by_page para cada página de
+        all_pages (mesma ordem dos matches), sem varrer tudo a cada página.
+        """
+        index: Dict[int, List[SearchMatch]] = defaultdict(list)
+        for im in self.instruction_matches:
+            for match in im.matches:
+                index[match.position.page].append(match)
+        return dict(index)
+    
     def get_matches_by_page(self, page: int) -> List[SearchMatch]:
         """Obtém todos os matches de uma página."""
         matches = []
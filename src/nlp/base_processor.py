@@ -5,6 +5,8 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from typing import List, Optional, Tuple
 
+import numpy as np
+
 from config.settings import Settings
 
 
@@ -48,6 +50,19 @@ class BaseNLPProcessor(ABC):
         """
         pass
     
+    def embed_query(self, text: str) -> Optional[np.ndarray]:
+        """
+        Obtém o embedding de uma query.
+        
+        Args:
+            text: Texto da query.
+        
+        Returns:
+            Optional[np.ndarray]: Vetor de embedding ou None se o
+            processador não gera embeddings.
+        """
+        return None
+    
     @abstractmethod
     def find_similar_passages(
         self,
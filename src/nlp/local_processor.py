@@ -152,6 +152,28 @@ class LocalNLPProcessor(BaseNLPProcessor):
             logger.warning(f"Erro ao calcular similaridade: {e}")
             return self._word_based_similarity(text1, text2)
     
+    def embed_query(self, text: str) -> Optional[np.ndarray]:
+        """
+        Obtém o embedding de uma query.
+        
+        Args:
+            text: Texto da query.
+        
+        Returns:
+            Optional[np.ndarray]: Vetor de embedding ou None se o
+            sentence-transformer não estiver disponível.
+        """
+        self.ensure_initialized()
+        
+        if self._sentence_model is None:
+            return None
+        
+        try:
+            return self._get_embedding(text)
+        except Exception as e:
+            logger.warning(f"Erro ao gerar embedding da query: {e}")
+            return None
+    
     def _get_embedding(self, text: str) -> np.ndarray:
         """
         Obtém embedding do texto com cache.
@@ -168,10 +190,14 @@ class LocalNLPProcessor(BaseNLPProcessor):
         
         text_hash = hash(text[:500])  # Hash dos primeiros 500 chars
         
-        if text_hash not in self._embeddings_cache:
-            self._embeddings_cache[text_hash] = self._sentence_model.encode(text)
+        # Uma única consulta ao cache: seguro com buscas em threads, mesmo
+        # que outra thread limpe o cache no meio
+        embedding = self._embeddings_cache.get(text_hash)
+        if embedding is None:
+            embedding = self._sentence_model.encode(text)
+            self._embeddings_cache[text_hash] = embedding
         
-        return self._embeddings_cache[text_hash]
+        return embedding
     
     def _word_based_similarity(self, text1: str, text2: str) -> float:
         """
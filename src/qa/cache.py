@@ -342,7 +342,7 @@ class ResponseCache:
                 }
             
             with open(cache_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
             
             logger.debug(f"Cache salvo: {len(data)} entradas")
             
@@ -17,7 +17,7 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Optional, Dict, Any, Callable
 
-from config.settings import Settings, get_settings
+from config.settings import Settings, get_settings, load_yaml
 from config.mode_manager import get_mode_manager, ModeManager
 from models.document import Document
 from core.pdf_reader import PDFReader
@@ -130,7 +130,6 @@ class QAConfig:
     @classmethod
     def from_yaml(cls, yaml_path: str = "./config.yaml") -> "QAConfig":
         """Cria configuração diretamente do arquivo YAML."""
-        import yaml
         from pathlib import Path
         
         config = cls()
@@ -140,8 +139,7 @@ class QAConfig:
             return config
         
         try:
-            with open(yaml_path, "r", encoding="utf-8") as f:
-                yaml_config = yaml.safe_load(f)
+            yaml_config = load_yaml(yaml_path)
             
             # Chunking
             chunking = yaml_config.get("rag", {}).get("chunking", {})
@@ -414,7 +412,10 @@ class QAEngine:
                 {"number": p.number, "text": p.text}
                 for p in self._document.pages
             ]
-            ocr_cache.save(pdf_path, pages_data, extraction_time)
+            ocr_cache.save(
+                pdf_path, pages_data, extraction_time,
+                total_words=sum(p.word_count for p in self._document.pages)
+            )
         
         self._report_progress("Indexando documento...", 0.4)
         
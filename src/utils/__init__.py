@@ -1,7 +1,5 @@
 """Utilitarios do aplicativo."""
 
-from .image_utils import ImageUtils
-from .text_utils import TextUtils
 from .console_utils import (
     setup_encoding,
     get_console,
@@ -31,3 +29,19 @@ __all__ = [
     "ASCII_CHARS",
     "SafePrinter",
 ]
+
+
+def __getattr__(name: str):
+    """
+    Carrega ImageUtils/TextUtils sob demanda.
+
+    ImageUtils depende de OpenCV/NumPy; importar o pacote apenas para
+    usar console_utils (caso da CLI) nao deve pagar esse custo.
+    """
+    if name == "ImageUtils":
+        from .image_utils import ImageUtils
+        return ImageUtils
+    if name == "TextUtils":
+        from .text_utils import TextUtils
+        return TextUtils
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")